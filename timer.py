@@ -13,54 +13,172 @@ import tkinter as tk
 import random
 import json
 import math
+import heapq
+import collections
+import array
+import bisect
+import re
+import io
+import itertools
+import threading
+import sqlite3
 from tkinter import messagebox, filedialog, colorchooser
 from tkinter import font as tkFont
 from tkinter.scrolledtext import ScrolledText
 from just_playback import Playback
-from datetime import datetime, timedelta
+from tinytag import TinyTag
+from datetime import datetime
 import os
+import time
+
+# All countdown arithmetic uses integer nanoseconds from time.monotonic_ns(),
+# so NTP corrections and DST changes can't move a deadline. Wall-clock time
+# only shows up when a deadline is saved to or restored from disk.
+NS_PER_SEC = 1_000_000_000
+NS_PER_MS = 1_000_000
+
+# Version of the per-timer fields in CurrentTimer.ini/.db. Version 1 (no "version" key) stored
+# end_time/pause_time as "%Y-%m-%d %H:%M:%S" strings and remaining_seconds, version 2 stores
+# end_ns/pause_ns as wall-clock epoch nanoseconds and remaining_ns.
+STATE_FORMAT_VERSION = 2
+
+
+def wall_ns_from_monotonic(mono_ns):
+    """Maps a time.monotonic_ns() instant to wall-clock epoch nanoseconds (for saving)."""
+    return time.time_ns() + (mono_ns - time.monotonic_ns())
+
+
+def monotonic_ns_from_wall(wall_ns):
+    """Maps wall-clock epoch nanoseconds back onto time.monotonic_ns() (for restoring)."""
+    return time.monotonic_ns() + (wall_ns - time.time_ns())
+
+
+def atomic_write_text(path, text):
+    """
+    Replaces a file without ever leaving it half-written: the text goes to a temp file
+    next to it, is fsynced, then renamed over the original in one step.
+    """
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # Make the rename itself durable where directories can be opened (not on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
 
 class Tooltip:
     """
     Creates a tooltip (pop-up) for a given widget.
+    The pop-up window is made once and then only withdrawn and shown again, with new text if it changed.
     """
     def __init__(self, widget, text):
         self.widget = widget
         self.text = text
         self.tooltip_window = None
+        self.label = None
+        self.visible = False
         self.widget.bind("<Enter>", self.show_tooltip)
         self.widget.bind("<Leave>", self.hide_tooltip)
 
     def show_tooltip(self, event=None):
-        if self.tooltip_window or not self.text:
+        if not self.text:
+            return
+
+        if self.tooltip_window is None:
+            self.tooltip_window = tk.Toplevel(self.widget)
+            self.tooltip_window.wm_overrideredirect(True)
+            self.label = tk.Label(self.tooltip_window, text=self.text, justify='left',
+                                  background="#2e2e2e", fg="white", relief='solid', borderwidth=1,
+                                  font=("tahoma", "8", "normal"), wraplength=164)
+            self.label.pack(ipadx=1)
+        elif self.label.cget("text") != self.text:
+            self.label.config(text=self.text)
+        elif self.visible:
             return
 
         # Use the mouse's screen position from the event
         x = self.widget.winfo_pointerx() + 15
         y = self.widget.winfo_pointery() + 10
-
-        self.tooltip_window = tk.Toplevel(self.widget)
-        self.tooltip_window.wm_overrideredirect(True)
         self.tooltip_window.wm_geometry(f"+{x}+{y}")
-
-        label = tk.Label(self.tooltip_window, text=self.text, justify='left',
-                         background="#2e2e2e", fg="white", relief='solid', borderwidth=1,
-                         font=("tahoma", "8", "normal"), wraplength=164)
-        label.pack(ipadx=1)
+        self.tooltip_window.deiconify()
+        self.visible = True
 
     def hide_tooltip(self, event=None):
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-        self.tooltip_window = None
+        if self.visible:
+            self.tooltip_window.withdraw()
+        self.visible = False
+
+class StyleTable:
+    """
+    Interns rich-text styles: each distinct (tag name, config) pair, like a font_... tag and its
+    font.actual() dict, is kept once and referred to by a small integer id.
+    """
+
+    def __init__(self):
+        self._styles = []  # style id -> (tag_name, config)
+        self._ids = {}  # canonical JSON of (tag_name, config) -> style id
+
+    def intern(self, tag_name, config):
+        key = json.dumps([tag_name, config], sort_keys=True)
+        style_id = self._ids.get(key)
+        if style_id is None:
+            style_id = self._ids[key] = len(self._styles)
+            self._styles.append((tag_name, config))
+        return style_id
+
+    def __getitem__(self, style_id):
+        return self._styles[style_id]
+
+
+NOTE_STYLES = StyleTable()  # Shared by every note
+
+
+def line_starts(text):
+    """Character offset at which each line of `text` starts, to convert Tk 'line.col' indexes."""
+    starts = [0]
+    for line in text.split("\n"):
+        starts.append(starts[-1] + len(line) + 1)
+    return starts
+
 
 class Note:
-    """Represents a single note with its properties."""
+    """
+    Represents a single note with its properties.
+    Formatting is stored as packed runs: (style id, start offset, end offset) triples in an int array,
+    with the styles themselves in the shared NOTE_STYLES table instead of a config dict per run.
+    """
+    __slots__ = ("id", "title", "description_text", "_runs", "completion_type", "completion_data",
+                 "_json", "_display", "_tooltip")
+    TITLE_WIDTH = 13  # Longer titles are cut short in the notes listbox
+    # Ids count up from the start-up time in nanoseconds, so they never collide within a run
+    # (bulk imports create many per microsecond) and keep increasing across runs.
+    _ids = itertools.count(time.time_ns())
+
     def __init__(self, title="Untitled", description="", completion_type="Plain Text", completion_data=None):
-        self.id = datetime.now().strftime("%Y%m%d%H%M%S%f") # Unique ID based on creation time
+        self.id = Note.new_id()
+        self._json = None  # Cached to_json() result, see invalidate()
+        self._display = None  # Cached display_text() result, same
+        self._tooltip = None  # Cached tooltip_text() result, same
         self.title = title
         # Description with font formatting
         self.description_text = description
-        self.description_tags = []
+        self._runs = ()  # array("i") of style id, start, end... once the description has any formatting
 
         # Completion Type: "Plain Text", "Checkboxes", or "Digits/Full Digits"
         self.completion_type = completion_type
@@ -75,16 +193,173 @@ class Note:
             else:
                 self.completion_data = None
 
+    @staticmethod
+    def new_id():
+        return f"{next(Note._ids):020d}"
+
+    @property
+    def description_tags(self):
+        """The formatting as (tag, 'line.col' start, 'line.col' end, config) tuples, like Tk's tag ranges."""
+        index = self._index_converter()
+        return [(tag_name, index(start), index(end), config) for tag_name, config, start, end in self.style_runs()]
+
+    @description_tags.setter
+    def description_tags(self, tags):
+        """Packs (tag, start, end, config) tuples with 'line.col' indexes. Set description_text first."""
+        self.set_style_ranges((tag_name, config, (start, end)) for tag_name, start, end, config in tags)
+
+    def set_style_ranges(self, styled_ranges):
+        """
+        Packs the formatting from (tag_name, config, [start, end, start, end...]) entries with 'line.col'
+        indexes, the way Tk's tag_ranges() returns them. Set description_text first.
+        """
+        offset = self._offset_converter()
+        style_ids = {}  # A Tk tag has one config, so each tag is interned once
+        runs = array.array("i")
+        for tag_name, config, indexes in styled_ranges:
+            style_id = style_ids.get(tag_name)
+            if style_id is None:
+                style_id = style_ids[tag_name] = NOTE_STYLES.intern(tag_name, config)
+            for start, end in zip(indexes[::2], indexes[1::2]):
+                runs.extend((style_id, offset(start), offset(end)))
+        self._runs = runs if runs else ()
+
+    def ranges_by_style(self):
+        """{style id: ['line.col' start, end, start, end...]}, so each tag goes to Tk in one tag_add call."""
+        index = self._index_converter()
+        grouped = {}
+        runs = self._runs
+        for i in range(0, len(runs), 3):
+            grouped.setdefault(runs[i], []).extend((index(runs[i + 1]), index(runs[i + 2])))
+        return grouped
+
+    def _index_converter(self):
+        """A function turning a character offset in the description into a Tk 'line.col' index."""
+        starts = line_starts(self.description_text)
+
+        def index(offset):
+            line = bisect.bisect_right(starts, offset) - 1
+            return f"{line + 1}.{offset - starts[line]}"
+        return index
+
+    def _offset_converter(self):
+        """A function turning a Tk 'line.col' index into a character offset in the description."""
+        starts = line_starts(self.description_text)
+        limit = len(self.description_text)
+
+        def offset(index):
+            line, col = (int(part) for part in str(index).split("."))
+            return min(limit, starts[min(line, len(starts) - 1) - 1] + col)
+        return offset
+
+    def style_runs(self):
+        """Yields (tag_name, config, start offset, end offset) for each formatted run."""
+        runs = self._runs
+        for i in range(0, len(runs), 3):
+            tag_name, config = NOTE_STYLES[runs[i]]
+            yield tag_name, config, runs[i + 1], runs[i + 2]
+
+    def state(self):
+        """Everything an edit can change, for undo. Only the mutable completion list is copied."""
+        data = self.completion_data
+        return (self.title, self.description_text, self._runs, self.completion_type,
+                list(data) if isinstance(data, list) else data)
+
+    def restore(self, state):
+        title, self.description_text, self._runs, self.completion_type, data = state
+        self.title = title
+        self.completion_data = list(data) if isinstance(data, list) else data
+        self.invalidate()
+
+    def style_ids(self):
+        """The distinct styles this note uses."""
+        return dict.fromkeys(self._runs[::3])
+
     def to_dict(self):
         """Converts the Note object to a dictionary for saving to a file."""
-        return {
+        data = {
             'id': self.id,
             'title': self.title,
             'description_text': self.description_text,
-            'description_tags': self.description_tags,
             'completion_type': self.completion_type,
             'completion_data': self.completion_data,
         }
+        if self._runs:
+            # The note carries its own small style table, so it can be read without the shared one
+            local_ids = {style_id: i for i, style_id in enumerate(self.style_ids())}
+            runs = list(self._runs)
+            runs[::3] = [local_ids[style_id] for style_id in runs[::3]]
+            data['description_styles'] = [list(NOTE_STYLES[style_id]) for style_id in local_ids]
+            data['description_runs'] = runs
+        return data
+
+    def to_json(self):
+        """Returns the note encoded as JSON. It's only re-encoded after invalidate()."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict())
+        return self._json
+
+    def invalidate(self):
+        """Drops the cached encoding and display texts. Call this after changing the note."""
+        self._json = None
+        self._display = None
+        self._tooltip = None
+
+    def display_text(self):
+        """The note's row in the notes listbox. Long titles are truncated, the tooltip shows them in full."""
+        if self._display is None:
+            prefix, suffix = self._completion_marks()
+            display_title = self.title
+
+            # Truncate title for display if it's too long
+            if len(self.title) > self.TITLE_WIDTH:
+                display_title = self.title[:self.TITLE_WIDTH] + "..."
+
+            self._display = f"  {prefix}{display_title}{suffix}"
+        return self._display
+
+    def tooltip_text(self):
+        """The full row for the listbox tooltip, or "" when the title isn't truncated and no tooltip is needed."""
+        if self._tooltip is None:
+            if len(self.title) > self.TITLE_WIDTH:
+                prefix, suffix = self._completion_marks()
+                self._tooltip = f"{prefix}{self.title}{suffix}"
+            else:
+                self._tooltip = ""
+        return self._tooltip
+
+    def _completion_marks(self):
+        prefix = ""
+        suffix = ""
+        if self.completion_type == "Checkboxes" and self.completion_data is True:
+            prefix = "✓ "
+        elif self.completion_type == "Digits/Full Digits":
+            if self.completion_data and len(self.completion_data) == 3:
+                current, _, maximum = self.completion_data
+                suffix = f"  [{current}/{maximum}]"
+        return prefix, suffix
+
+    @staticmethod
+    def list_to_json(notes):
+        """Encodes a list of notes exactly like json.dumps would, reusing each note's cached encoding."""
+        return "[" + ", ".join(note.to_json() for note in notes) + "]"
+
+    @staticmethod
+    def ensure_unique_ids(notes_data):
+        """
+        Gives every note dict a unique id in place (older files can have notes without one, or
+        with a repeated one). Returns True if any id had to be changed.
+        """
+        seen_ids = set()
+        changed = False
+        for data in notes_data:
+            note_id = data.get("id")
+            if not note_id or note_id in seen_ids:
+                note_id = f"{note_id or 'note'}-{len(seen_ids)}"
+                data["id"] = note_id
+                changed = True
+            seen_ids.add(note_id)
+        return changed
 
     @classmethod
     def from_dict(cls, data):
@@ -95,58 +370,1880 @@ class Note:
             completion_type=data.get('completion_type', 'Plain Text'),
             completion_data=data.get('completion_data')
         )
-        note.id = data.get('id', datetime.now().strftime("%Y%m%d%H%M%S%f"))
-        note.description_tags = data.get('description_tags', [])
+        note.id = data.get('id', note.id)
+        if 'description_runs' in data:
+            style_ids = [NOTE_STYLES.intern(tag_name, config) for tag_name, config in data.get('description_styles', [])]
+            runs = array.array("i", data['description_runs'])
+            runs[::3] = array.array("i", (style_ids[local_id] for local_id in runs[::3]))
+            note._runs = runs
+        elif data.get('description_tags'):
+            note.description_tags = data['description_tags']  # Older files: one config per run
         return note
 
     def __repr__(self):
         return f"<Note: {self.title}>"
 
 
+class NoteList:
+    """
+    One timer's notes in display order, indexed by note id so a note is found in O(1).
+    Deletes and inserts shift the positions after them; instead of renumbering those right away,
+    the index is only trusted below `_indexed` and extended from there when a lookup needs it.
+    """
+
+    def __init__(self, notes=()):
+        self._notes = list(notes)
+        self._index = {}  # note id -> position, exact for positions below _indexed
+        self._indexed = 0
+
+    def __len__(self):
+        return len(self._notes)
+
+    def __iter__(self):
+        return iter(self._notes)
+
+    def __getitem__(self, position):
+        return self._notes[position]
+
+    def __setitem__(self, position, note):
+        position = self._normalize(position)
+        self._index.pop(self._notes[position].id, None)
+        self._notes[position] = note
+        if position < self._indexed:
+            self._index[note.id] = position
+
+    def __delitem__(self, position):
+        position = self._normalize(position)
+        self._index.pop(self._notes[position].id, None)
+        del self._notes[position]
+        self._indexed = min(self._indexed, position)
+
+    def append(self, note):
+        self._notes.append(note)
+        if self._indexed == len(self._notes) - 1:
+            self._index[note.id] = self._indexed
+            self._indexed += 1
+
+    def insert(self, position, note):
+        self._notes.insert(position, note)
+        position = min(max(position, 0), len(self._notes) - 1)
+        # The notes after it moved up one. Their old entries would point below where they are now,
+        # where a later lookup could take them as exact, so they're dropped (list.insert is O(n) anyway).
+        for shifted in self._notes[position + 1:]:
+            self._index.pop(shifted.id, None)
+        self._indexed = min(self._indexed, position)
+
+    def swap(self, first, second):
+        """Exchanges two notes, keeping both index entries exact."""
+        notes = self._notes
+        notes[first], notes[second] = notes[second], notes[first]
+        for position in (first, second):
+            if position < self._indexed:
+                self._index[notes[position].id] = position
+            else:
+                self._index.pop(notes[position].id, None)  # Its old entry may be below where it is now
+
+    def index_of(self, note_id):
+        """Returns the position of the note with this id, or None."""
+        position = self._index.get(note_id)
+        if position is not None and position < self._indexed:
+            return position
+
+        while self._indexed < len(self._notes):
+            note = self._notes[self._indexed]
+            self._index[note.id] = self._indexed
+            self._indexed += 1
+            if note.id == note_id:
+                return self._indexed - 1
+        return None
+
+    def get(self, note_id):
+        position = self.index_of(note_id)
+        return None if position is None else self._notes[position]
+
+    def _normalize(self, position):
+        return range(len(self._notes))[position]  # Also raises IndexError like a list would
+
+
+class NoteSearchIndex:
+    """
+    Inverted index over every timer's note titles and descriptions: word -> {(timer_id, note_id): weight}.
+    It's kept up to date one note at a time, so a query only looks at the postings of its own words.
+    The last word of a query also matches as a prefix, so results show up while typing.
+    """
+    TITLE_WEIGHT = 3  # A word in the title counts as much as three in the description
+
+    def __init__(self):
+        self.postings = {}  # word -> {(timer_id, note_id): weight}
+        self.docs = {}  # (timer_id, note_id) -> (title, words)
+        self.indexed = set()  # Timers whose notes are all in the index
+        self._notes_by_timer = {}  # timer_id -> note ids in the index
+        self._vocabulary = None  # Sorted words for prefix lookups, rebuilt after words come or go
+
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r"\w+", (text or "").lower())
+
+    def add_timer(self, timer_id, notes):
+        """Indexes a whole timer, given its notes as (note_id, title, description) tuples."""
+        for note_id, title, description in notes:
+            self.update(timer_id, note_id, title, description)
+        self.indexed.add(timer_id)
+
+    def drop_timer(self, timer_id):
+        """Forgets a timer (e.g. its notes were replaced). It's indexed again when a search needs it."""
+        for note_id in list(self._notes_by_timer.pop(timer_id, ())):
+            self.remove(timer_id, note_id)
+        self.indexed.discard(timer_id)
+
+    def update(self, timer_id, note_id, title, description):
+        doc = (timer_id, note_id)
+        self.remove(timer_id, note_id)
+
+        weights = {}
+        for word in self.tokenize(title):
+            weights[word] = weights.get(word, 0) + self.TITLE_WEIGHT
+        for word in self.tokenize(description):
+            weights[word] = weights.get(word, 0) + 1
+
+        for word, weight in weights.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                self._vocabulary = None
+            self.postings[word][doc] = weight
+        self.docs[doc] = (title, tuple(weights))
+        self._notes_by_timer.setdefault(timer_id, set()).add(note_id)
+
+    def remove(self, timer_id, note_id):
+        doc = (timer_id, note_id)
+        entry = self.docs.pop(doc, None)
+        if entry is None:
+            return
+        for word in entry[1]:
+            posting = self.postings[word]
+            del posting[doc]
+            if not posting:
+                del self.postings[word]
+                self._vocabulary = None
+        self._notes_by_timer.get(timer_id, set()).discard(note_id)
+
+    def search(self, text, limit=100):
+        """Returns up to `limit` hits as (score, timer_id, note_id, title), best first. Every word has to match."""
+        words = self.tokenize(text)
+        if not words:
+            return []
+
+        # Rarer words weigh more (idf). Whole words go rarest first so the candidate set shrinks fast.
+        total = len(self.docs)
+        scores = None
+        for word in sorted(set(words[:-1]), key=lambda w: len(self.postings.get(w, ()))):
+            posting = self.postings.get(word)
+            if not posting:
+                return []
+            idf = math.log(1 + total / len(posting))
+            if scores is None:
+                scores = {doc: weight * idf for doc, weight in posting.items()}
+            else:
+                scores = {doc: score + posting[doc] * idf for doc, score in scores.items() if doc in posting}
+            if not scores:
+                return []
+
+        # The last word is a prefix. A note matching it with several words counts its best one.
+        matches = [(posting, math.log(1 + total / len(posting)))
+                   for posting in (self.postings[word] for word in self._with_prefix(words[-1]))]
+        if scores is None:
+            scores = {}
+            for posting, idf in matches:
+                for doc, weight in posting.items():
+                    scores[doc] = max(scores.get(doc, 0), weight * idf)
+        else:
+            candidates = scores
+            scores = {}
+            for doc, score in candidates.items():
+                best = max((posting.get(doc, 0) * idf for posting, idf in matches), default=0)
+                if best:
+                    scores[doc] = score + best
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, doc[0], doc[1], self.docs[doc][0]) for doc, score in best]
+
+    def _with_prefix(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = start
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(prefix):
+            end += 1
+        return self._vocabulary[start:end]
+
+
+class UndoHistory:
+    """
+    Bounded undo/redo log of note operations. Entries describe how to invert a change ("this note went
+    from state A to B", "note N was deleted at 3") and share the note objects and strings with the live
+    data, so recording one is cheap. The oldest entries are dropped past max_entries or max_bytes
+    (a rough count of what the entries keep alive on their own).
+    """
+
+    def __init__(self, max_entries=500, max_bytes=2_000_000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._undo = collections.deque()  # (op, cost), newest last
+        self._redo = []
+
+    def record(self, op, cost=64):
+        self._undo.append((op, cost))
+        self.bytes += cost
+        self.bytes -= sum(cost for _, cost in self._redo)
+        self._redo.clear()
+        while self._undo and (len(self._undo) > self.max_entries or self.bytes > self.max_bytes):
+            self.bytes -= self._undo.popleft()[1]
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.bytes = 0
+
+    def undo(self):
+        """Returns the operation to revert, or None."""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry[0]
+
+    def redo(self):
+        """Returns the operation to apply again, or None."""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry[0]
+
+    @classmethod
+    def cost(cls, op):
+        """Rough bytes an operation keeps alive, for the max_bytes cap."""
+        if op[0] == "batch":
+            return sum(cls.cost(sub_op) for sub_op in op[2])
+        if op[0] == "edit":
+            return cls.edit_cost(op[3], op[4])
+        return 64
+
+    @staticmethod
+    def edit_cost(before, after):
+        """What an edit entry keeps alive: the parts of the old state no longer shared with the new one."""
+        cost = 64
+        for old, new in zip(before, after):
+            if old is not new and isinstance(old, (str, array.array)):
+                cost += len(old) * (old.itemsize if isinstance(old, array.array) else 1)
+        return cost
+
+
+class DeadlineHeap:
+    """
+    Min-heap of timer deadlines (time.monotonic_ns() values).
+    Rescheduled or cancelled timers are dropped lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap = []  # (deadline_ns, generation, timer_id)
+        self._live = {}  # timer_id -> generation of its valid heap entry
+        self._generations = itertools.count()
+
+    def schedule(self, timer_id, deadline):
+        """Adds a timer or moves it to a new deadline."""
+        generation = next(self._generations)
+        self._live[timer_id] = generation
+        heapq.heappush(self._heap, (deadline, generation, timer_id))
+
+    def cancel(self, timer_id):
+        """Forgets a timer (paused, stopped or reset). Its heap entry goes stale."""
+        self._live.pop(timer_id, None)
+
+    def __contains__(self, timer_id):
+        return timer_id in self._live
+
+    def __len__(self):
+        return len(self._live)
+
+    def upcoming(self, count):
+        """Ids of the (at most) `count` timers due soonest, soonest first."""
+        live = (entry for entry in self._heap if self._live.get(entry[2]) == entry[1])
+        return [timer_id for _, _, timer_id in heapq.nsmallest(count, live)]
+
+    def peek(self):
+        """Returns the earliest live deadline, or None when nothing is counting down."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now):
+        """Removes and returns (in deadline order) every timer whose deadline is <= now."""
+        expired = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, timer_id = heapq.heappop(self._heap)
+            if self._live.get(timer_id) == generation:
+                del self._live[timer_id]
+                expired.append(timer_id)
+            self._drop_stale()
+        return expired
+
+    def _drop_stale(self):
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+        # Rebuild once stale entries dominate, so a lot of pause/resume doesn't grow the heap forever
+        if len(self._heap) > 2 * len(self._live) + 16:
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+
+class TimerStore:
+    """
+    Holds the saved state of every timer, keyed by timer id, in display order.
+    Lookup by id and by position are O(1); the next expiry comes from the DeadlineScheduler heap.
+    Remembers which timers, and which of their notes, changed so saving only has to write those.
+    Notes loaded from disk stay as raw JSON until notes() is asked for them, so startup only
+    parses the notes of the timer that is actually shown.
+    """
+    DEFAULT_COUNT = 8
+
+    def __init__(self, count=DEFAULT_COUNT):
+        self._data = {}  # timer_id -> state dict
+        self._order = []  # timer ids in display order
+        self._position = {}  # timer_id -> index in _order
+        self.titles = {}
+        self.fired = set()  # Timers whose alarm already went off
+        self.dirty = set()  # Timers changed since the last save
+        self.changed_notes = {}  # timer_id -> {note_id: Note} edited since the last save
+        self.reordered = set()  # Timers whose note list was added to, deleted from or reordered
+        self.replaced = set()  # Timers whose whole note list was swapped out
+        self._raw_notes = {}  # timer_id -> notes JSON that hasn't been turned into Note objects yet
+        self.note_index = NoteSearchIndex()  # Filled per timer by the first search that needs it
+        self._next_id = 0
+
+        for _ in range(count):
+            self.add()
+
+    @staticmethod
+    def default_title(timer_id):
+        return f"Timer {timer_id + 1}"
+
+    def add(self, timer_id=None, title=None):
+        """Appends a new empty timer (or makes sure timer_id exists) and returns its id."""
+        if timer_id is None:
+            timer_id = self._next_id
+        if timer_id in self._data:
+            return timer_id
+
+        self._next_id = max(self._next_id, timer_id + 1)
+        self._data[timer_id] = {"notes": NoteList()}
+        self._position[timer_id] = len(self._order)
+        self._order.append(timer_id)
+        self.titles[timer_id] = title or self.default_title(timer_id)
+        self.dirty.add(timer_id)
+        return timer_id
+
+    def __getitem__(self, timer_id):
+        return self._data[timer_id]
+
+    def __setitem__(self, timer_id, data):
+        if timer_id not in self._data:
+            self.add(timer_id)
+        self._data[timer_id] = data
+        self._raw_notes.pop(timer_id, None)
+        self.note_index.drop_timer(timer_id)
+        self.dirty.add(timer_id)
+        self.replaced.add(timer_id)
+
+    def __contains__(self, timer_id):
+        return timer_id in self._data
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def position(self, timer_id):
+        return self._position[timer_id]
+
+    def id_at(self, position):
+        return self._order[position % len(self._order)]
+
+    def set_raw_notes(self, timer_id, notes_json):
+        """Keeps a timer's notes as the JSON they were loaded from until something needs them."""
+        self._data[timer_id].pop("notes", None)
+        self._raw_notes[timer_id] = notes_json
+        self.note_index.drop_timer(timer_id)
+
+    def notes(self, timer_id):
+        """Returns the timer's list of Note objects, building it from the raw JSON on first use."""
+        data = self._data[timer_id]
+        notes_json = self._raw_notes.pop(timer_id, None)
+        if notes_json is not None:
+            notes_data = json.loads(notes_json)
+            if Note.ensure_unique_ids(notes_data):
+                self.notes_replaced(timer_id)  # The fixed ids have to reach the disk
+            data["notes"] = NoteList(Note.from_dict(note_data) for note_data in notes_data)
+        if "notes" not in data:
+            data["notes"] = NoteList()
+        return data["notes"]
+
+    def notes_loaded(self, timer_id):
+        return timer_id not in self._raw_notes
+
+    def notes_json(self, timer_id):
+        """The timer's notes as a JSON list, without parsing them if they haven't been yet."""
+        if timer_id in self._raw_notes:
+            return self._raw_notes[timer_id]
+        return Note.list_to_json(self._data[timer_id].get("notes", []))
+
+    def mark_dirty(self, timer_id):
+        self.dirty.add(timer_id)
+
+    def take_dirty(self):
+        """Returns the ids changed since the last call and starts tracking afresh."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def note_changed(self, timer_id, note):
+        self.changed_notes.setdefault(timer_id, {})[note.id] = note
+        self.dirty.add(timer_id)
+        if timer_id in self.note_index.indexed:
+            self.note_index.update(timer_id, note.id, note.title, note.description_text)
+
+    def note_removed(self, timer_id, note):
+        self.note_index.remove(timer_id, note.id)
+        self.notes_reordered(timer_id)
+
+    def notes_reordered(self, timer_id):
+        self.reordered.add(timer_id)
+        self.dirty.add(timer_id)
+
+    def notes_replaced(self, timer_id):
+        self.replaced.add(timer_id)
+        self.dirty.add(timer_id)
+        self.note_index.drop_timer(timer_id)
+
+    def take_note_changes(self):
+        """
+        Returns ({timer_id: {note_id: note JSON}}, {timer_id: [note ids in order]}) for the notes
+        edited and the lists reordered since the last call.
+        """
+        changed = {timer_id: {note_id: note.to_json() for note_id, note in notes.items()}
+                   for timer_id, notes in self.changed_notes.items()}
+        reordered = set(self.reordered)
+        for timer_id in self.replaced:
+            changed[timer_id] = self._split_notes(timer_id)
+            reordered.add(timer_id)
+        order = {timer_id: list(changed[timer_id]) if timer_id in self.replaced
+                 else [note.id for note in self.notes(timer_id)] for timer_id in reordered}
+        # Only the note tracking: dirty timers are collected separately, by take_dirty()
+        self.changed_notes, self.reordered, self.replaced = {}, set(), set()
+        return changed, order
+
+    def forget_changes(self):
+        """Drops all change tracking, e.g. right after loading what is already on disk."""
+        self.dirty = set()
+        self.changed_notes, self.reordered, self.replaced = {}, set(), set()
+
+    def _split_notes(self, timer_id):
+        """{note_id: note JSON} for a whole list, splitting raw JSON without building Note objects."""
+        if timer_id not in self._raw_notes:
+            return {note.id: note.to_json() for note in self._data[timer_id].get("notes", [])}
+        notes_data = json.loads(self._raw_notes[timer_id])
+        if Note.ensure_unique_ids(notes_data):
+            self._raw_notes[timer_id] = json.dumps(notes_data)
+        return {note_data["id"]: json.dumps(note_data) for note_data in notes_data}
+
+    def search_notes(self, text, limit=100):
+        """
+        Ranked note hits across all timers, see NoteSearchIndex.search. A timer is indexed the first
+        time a search needs it, straight from its JSON when its notes haven't been loaded.
+        """
+        for timer_id in self._order:
+            if timer_id not in self.note_index.indexed:
+                self.note_index.add_timer(timer_id, self._note_texts(timer_id))
+        return self.note_index.search(text, limit)
+
+    def _note_texts(self, timer_id):
+        if timer_id in self._raw_notes:
+            notes_data = json.loads(self._raw_notes[timer_id])
+            Note.ensure_unique_ids(notes_data)  # Same ids notes() will give them
+            return [(data["id"], data.get("title", "Untitled"), data.get("description_text", ""))
+                    for data in notes_data]
+        return [(note.id, note.title, note.description_text) for note in self._data[timer_id].get("notes", [])]
+
+    def search(self, text):
+        """Returns ids (in display order) whose title or number contains text, case-insensitively."""
+        text = text.strip().lower()
+        if not text:
+            return list(self._order)
+        return [timer_id for timer_id in self._order
+                if text in self.titles[timer_id].lower() or text == str(timer_id + 1)]
+
+
+class TimerEngine:
+    """
+    Owns the running state of every timer (start, pause, resume, stop, expiry, fired flags)
+    without touching Tk, so thousands of timers can be driven from tests or benchmarks.
+
+    Listeners registered with subscribe() are called as listener(event, timer_id) where event is
+    "loaded", "started", "paused", "resumed", "stopped" or "expired". Nothing expires by itself: whoever
+    owns the event loop calls poll() once next_deadline() has passed.
+    """
+
+    def __init__(self, timers=None, clock=time.monotonic_ns):
+        self.timers = timers if timers is not None else TimerStore()
+        self.clock = clock
+        self.deadlines = DeadlineHeap()
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, timer_id):
+        for listener in self.listeners:
+            listener(event, timer_id)
+
+    # --- State queries ---
+    def is_running(self, timer_id):
+        return self.timers[timer_id].get("running", False)
+
+    def is_paused(self, timer_id):
+        return self.timers[timer_id].get("paused", False)
+
+    def remaining_ns(self, timer_id, now=None):
+        """Time left on a timer; frozen while paused, 0 once stopped or expired."""
+        data = self.timers[timer_id]
+        if not data.get("running"):
+            return 0
+        if data.get("paused"):
+            return data.get("remaining_ns") or 0
+        return max(0, data["end_ns"] - (self.clock() if now is None else now))
+
+    def next_deadline(self):
+        return self.deadlines.peek()
+
+    # --- Transitions ---
+    def load(self, timer_id, data):
+        """Replaces a timer's whole state (restore, present load) and schedules it if it's counting down."""
+        self.timers[timer_id] = data
+        if data.get("running") and not data.get("paused") and data.get("end_ns") is not None:
+            self.deadlines.schedule(timer_id, data["end_ns"])
+        else:
+            self.deadlines.cancel(timer_id)
+        self.emit("loaded", timer_id)
+
+    def start(self, timer_id, duration_ns):
+        end_ns = self.clock() + duration_ns
+        self._set_state(timer_id, running=True, paused=False, end_ns=end_ns, pause_ns=None, remaining_ns=duration_ns)
+        self.timers.fired.discard(timer_id)
+        self.deadlines.schedule(timer_id, end_ns)
+        self.emit("started", timer_id)
+
+    def stop(self, timer_id):
+        self._set_state(timer_id, running=False, paused=False, end_ns=None, pause_ns=None, remaining_ns=0)
+        self.timers.fired.discard(timer_id)
+        self.deadlines.cancel(timer_id)
+        self.emit("stopped", timer_id)
+
+    def pause(self, timer_id):
+        data = self.timers[timer_id]
+        if not data.get("running") or data.get("paused"):
+            return False
+
+        now = self.clock()
+        self._set_state(timer_id, paused=True, pause_ns=now, remaining_ns=data["end_ns"] - now)
+        self.deadlines.cancel(timer_id)
+        self.emit("paused", timer_id)
+        return True
+
+    def resume(self, timer_id, new_duration_ns=None):
+        """Resumes where the timer left off, or restarts it with new_duration_ns ("Update Timer")."""
+        data = self.timers[timer_id]
+        if not data.get("running") or not data.get("paused"):
+            return False
+
+        now = self.clock()
+        if new_duration_ns is not None:
+            end_ns = now + new_duration_ns
+            remaining_ns = new_duration_ns
+        else:
+            end_ns = data["end_ns"] + (now - data["pause_ns"])
+            remaining_ns = data.get("remaining_ns")
+        self._set_state(timer_id, paused=False, end_ns=end_ns, remaining_ns=remaining_ns)
+        self.deadlines.schedule(timer_id, end_ns)
+        self.emit("resumed", timer_id)
+        return True
+
+    def poll(self, now=None):
+        """Expires every timer whose deadline has passed and returns their ids."""
+        expired = self.deadlines.pop_expired(self.clock() if now is None else now)
+        for timer_id in expired:
+            self._set_state(timer_id, running=False, paused=False, end_ns=None, pause_ns=None, remaining_ns=0)
+            self.timers.fired.add(timer_id)
+            self.emit("expired", timer_id)
+        return expired
+
+    def _set_state(self, timer_id, **state):
+        self.timers[timer_id].update(state)
+        self.timers.mark_dirty(timer_id)
+
+
+class DeadlineScheduler:
+    """
+    Tk side of the TimerEngine: keeps exactly one root.after() armed for the engine's
+    next deadline and polls the engine when it comes due.
+    """
+    # Long waits are re-armed in chunks so Tk never gets a huge delay value.
+    MAX_ARM_MS = 3600 * 1000
+
+    def __init__(self, root, engine):
+        self.root = root
+        self.engine = engine
+        self._after_id = None
+        self._armed_deadline = None
+        engine.subscribe(lambda event, timer_id: self.rearm())
+
+    def rearm(self):
+        next_deadline = self.engine.next_deadline()
+
+        if next_deadline == self._armed_deadline:
+            return  # Already waiting for exactly this deadline
+
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._armed_deadline = next_deadline
+
+        if next_deadline is None:
+            return
+
+        delay_ms = -(-(next_deadline - self.engine.clock()) // NS_PER_MS)  # Rounded up
+        delay_ms = max(0, min(delay_ms, self.MAX_ARM_MS))
+        self._after_id = self.root.after(delay_ms, self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        self._armed_deadline = None
+        self.engine.poll()
+        self.rearm()
+
+
+class WriteBehindPersister:
+    """
+    Runs save jobs on a background thread so the Tk thread never waits on the disk.
+    Jobs are keyed (usually by file path): a newer job for the same key replaces the pending one,
+    and it only runs once saves have been quiet for `delay` seconds (or `max_wait` has passed),
+    so a burst of edits ends up as a single write.
+    """
+
+    def __init__(self, delay=0.3, max_wait=2.0):
+        self.delay = delay
+        self.max_wait = max_wait
+        self._jobs = {}  # key -> [first_submit, due, job]
+        self._busy = False
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="WriteBehindPersister", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, job):
+        now = time.monotonic()
+        with self._cond:
+            first = self._jobs[key][0] if key in self._jobs else now
+            self._jobs[key] = [first, min(now + self.delay, first + self.max_wait), job]
+            self._cond.notify()
+
+    def write_text(self, path, text):
+        """Queues `text` to replace the contents of `path`."""
+        self.submit(path, lambda: self._write_text(path, text))
+
+    def flush(self):
+        """Runs every pending job right away and waits until they've finished."""
+        with self._cond:
+            for entry in self._jobs.values():
+                entry[1] = 0
+            self._cond.notify()
+            while self._jobs or self._busy:
+                self._cond.wait()
+
+    def close(self):
+        """Flushes and stops the worker. Called on exit so nothing queued gets lost."""
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    @staticmethod
+    def _write_text(path, text):
+        atomic_write_text(path, text)
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._jobs:
+                    if self._closing:
+                        return
+                    self._cond.wait()
+                    continue
+
+                key = min(self._jobs, key=lambda k: self._jobs[k][1])
+                wait = self._jobs[key][1] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                job = self._jobs.pop(key)[2]
+                self._busy = True
+                self._cond.release()
+                try:
+                    job()
+                except Exception as e:
+                    print(f"Failed to save '{key}' in the background: {e}")
+                finally:
+                    self._cond.acquire()
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+class JournaledIniState:
+    """
+    CurrentTimer.ini is a checkpoint. Every save after it is one line appended to
+    CurrentTimer.journal holding only the timer settings, notes and note orders that changed.
+    Loading replays the journal over the checkpoint. Once the journal gets long it is folded
+    into a new checkpoint (written atomically) and emptied, so recovery stays short.
+
+    queue() is called on the Tk thread. commit() and checkpoint() run on the persister thread,
+    which is the only one touching the in-memory mirror of the file after load().
+    """
+    CHECKPOINT_EVERY = 100  # Journal lines
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        # timer_id -> {"fields": {...}, "notes_raw": JSON text or None, "notes": {note_id: JSON text} or None}
+        self._timers = {}
+        self._rendered = {}  # timer_id -> section text, reused by the next checkpoint if unchanged
+        self._journal_lines = 0
+        self._lock = threading.Lock()
+        self._pending = self._empty_batch()
+
+    @staticmethod
+    def _empty_batch():
+        return {"timers": {}, "notes": {}, "order": {}}
+
+    def load(self):
+        """Reads the checkpoint, replays the journal and returns [(timer_id, fields, notes_json)] in file order."""
+        if os.path.exists(self.path):
+            config = configparser.ConfigParser(interpolation=None)
+            config.read(self.path)
+            for section_name in config.sections():
+                timer_id = TimerApp.section_timer_id(section_name, "TIMER ")
+                if timer_id is None:
+                    continue
+                fields = dict(config[section_name])
+                self._timers[timer_id] = {"fields": fields, "notes_raw": fields.pop("notes", "[]"), "notes": None}
+
+        if os.path.exists(self.journal_path):
+            good_end = 0  # Byte offset just past the last complete record
+            torn = False
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        # A record is only complete with its newline, commit() writes them together
+                        if not line.endswith(b"\n"):
+                            raise ValueError("no newline")
+                        record = json.loads(line)
+                    except ValueError:
+                        torn = True  # A torn last line from a crash mid-append, everything before it is good
+                        break
+                    good_end += len(line)
+                    self._apply({
+                        "timers": {int(k): v for k, v in record["timers"].items()},
+                        "notes": {int(k): {note_id: json.dumps(note) for note_id, note in v.items()}
+                                  for k, v in record["notes"].items()},
+                        "order": {int(k): v for k, v in record["order"].items()},
+                    })
+                    self._journal_lines += 1
+
+            if torn:
+                # Cut the garbage off, or the next commit would be appended after it and never read back
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_end)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        return [(timer_id, entry["fields"], self._notes_json(entry)) for timer_id, entry in self._timers.items()]
+
+    def queue(self, timers, notes, order):
+        """
+        Adds changes to the next commit. timers: {id: fields}, notes: {id: {note_id: JSON text}},
+        order: {id: [note ids]} for timers whose note list was reordered, added to or deleted from.
+        """
+        with self._lock:
+            self._pending["timers"].update(timers)
+            for timer_id, blobs in notes.items():
+                self._pending["notes"].setdefault(timer_id, {}).update(blobs)
+            self._pending["order"].update(order)
+
+    def commit(self):
+        """Appends everything queued as one journal line, checkpointing when the journal is long."""
+        with self._lock:
+            batch, self._pending = self._pending, self._empty_batch()
+        if not any(batch.values()):
+            return
+
+        self._apply(batch)
+        with open(self.journal_path, "a") as f:
+            f.write(self._encode_batch(batch) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_lines += 1
+
+        if self._journal_lines >= self.CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Writes the whole state as a fresh CurrentTimer.ini and empties the journal."""
+        for timer_id, entry in self._timers.items():
+            if timer_id not in self._rendered:
+                values = dict(entry["fields"], notes=self._notes_json(entry))
+                self._rendered[timer_id] = self.render_section(f"TIMER {timer_id}", values)
+        atomic_write_text(self.path, "".join(self._rendered[timer_id] for timer_id in self._timers))
+
+        # If we crash before this, replaying the old journal over the new checkpoint changes nothing
+        open(self.journal_path, "w").close()
+        self._journal_lines = 0
+
+    @staticmethod
+    def render_section(name, values):
+        """Renders a single INI section to text, exactly as ConfigParser.write would."""
+        config = configparser.ConfigParser(interpolation=None)
+        config[name] = values
+        buffer = io.StringIO()
+        config.write(buffer)
+        return buffer.getvalue()
+
+    def _apply(self, batch):
+        for timer_id, fields in batch["timers"].items():
+            self._entry(timer_id)["fields"] = fields
+            self._rendered.pop(timer_id, None)
+
+        for timer_id, blobs in batch["notes"].items():
+            self._parsed_notes(timer_id).update(blobs)
+            self._rendered.pop(timer_id, None)
+
+        # Orders go last: they also drop notes deleted since (even ones edited in this same batch)
+        for timer_id, order in batch["order"].items():
+            notes = self._parsed_notes(timer_id)
+            self._timers[timer_id]["notes"] = {note_id: notes[note_id] for note_id in order if note_id in notes}
+            self._rendered.pop(timer_id, None)
+
+    def _entry(self, timer_id):
+        if timer_id not in self._timers:
+            self._timers[timer_id] = {"fields": {}, "notes_raw": None, "notes": {}}
+        return self._timers[timer_id]
+
+    def _parsed_notes(self, timer_id):
+        """Splits a timer's notes into per-note JSON the first time one of them changes."""
+        entry = self._entry(timer_id)
+        if entry["notes"] is None:
+            entry["notes"] = {note.get("id"): json.dumps(note) for note in json.loads(entry["notes_raw"] or "[]")}
+            entry["notes_raw"] = None
+        return entry["notes"]
+
+    @staticmethod
+    def _notes_json(entry):
+        if entry["notes"] is None:
+            return entry["notes_raw"] or "[]"
+        return "[" + ", ".join(entry["notes"].values()) + "]"
+
+    @staticmethod
+    def _encode_batch(batch):
+        """One JSON line. Note JSON is spliced in as-is instead of being decoded and encoded again."""
+        notes = ", ".join(
+            f'"{timer_id}": {{' + ", ".join(f"{json.dumps(note_id)}: {blob}" for note_id, blob in blobs.items()) + "}"
+            for timer_id, blobs in batch["notes"].items())
+        return ('{"timers": ' + json.dumps({str(k): v for k, v in batch["timers"].items()})
+                + ', "notes": {' + notes + '}'
+                + ', "order": ' + json.dumps({str(k): v for k, v in batch["order"].items()}) + "}")
+
+
+def is_sqlite_path(path):
+    """Present and state files ending in .db or .sqlite use the SQLite backend instead of INI."""
+    return os.path.splitext(path)[1].lower() in (".db", ".sqlite")
+
+
+class SqliteState:
+    """
+    SQLite version of the state/present storage (WAL mode). Timers and notes are rows keyed by
+    timer id and note id, so saving one edited note is one row write instead of a file rewrite.
+    The running state lives under present "" and named presents can share the same file.
+
+    Has the same load/queue/commit/checkpoint interface as JournaledIniState, so TimerApp
+    doesn't care which one it's talking to.
+    """
+    LIVE = ""  # Present name of the live state
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS presents (
+            name TEXT PRIMARY KEY,
+            saved_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS timers (
+            present TEXT NOT NULL,
+            timer_id INTEGER NOT NULL,
+            fields TEXT NOT NULL,
+            PRIMARY KEY (present, timer_id)
+        );
+        CREATE TABLE IF NOT EXISTS notes (
+            present TEXT NOT NULL,
+            timer_id INTEGER NOT NULL,
+            note_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (present, timer_id, note_id)
+        );
+        CREATE INDEX IF NOT EXISTS notes_by_position ON notes (present, timer_id, position);
+    """
+
+    def __init__(self, path, present=LIVE, migrate_from=None):
+        self.path = path
+        self.present = present
+        self.migrate_from = migrate_from  # An INI state file to import on first use
+        # Opened on the Tk thread, used by the persister thread afterwards (never both at once)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = JournaledIniState._empty_batch()
+
+    def load(self):
+        """Returns [(timer_id, fields, notes_json)] in timer id order, importing the INI state the first time."""
+        if self.migrate_from and os.path.exists(self.migrate_from) and not self._has_rows():
+            self.replace(JournaledIniState(self.migrate_from).load())
+
+        notes = {}
+        for timer_id, data in self.db.execute(
+                "SELECT timer_id, data FROM notes WHERE present = ? ORDER BY timer_id, position", (self.present,)):
+            notes.setdefault(timer_id, []).append(data)
+
+        return [(timer_id, json.loads(fields), "[" + ", ".join(notes.get(timer_id, ())) + "]")
+                for timer_id, fields in self.db.execute(
+                    "SELECT timer_id, fields FROM timers WHERE present = ? ORDER BY timer_id", (self.present,))]
+
+    def queue(self, timers, notes, order):
+        """Adds changes to the next commit, same arguments as JournaledIniState.queue."""
+        with self._lock:
+            self._pending["timers"].update(timers)
+            for timer_id, blobs in notes.items():
+                self._pending["notes"].setdefault(timer_id, {}).update(blobs)
+            self._pending["order"].update(order)
+
+    def commit(self):
+        """Writes everything queued in one transaction, touching only the rows that changed."""
+        with self._lock:
+            batch, self._pending = self._pending, JournaledIniState._empty_batch()
+        if not any(batch.values()):
+            return
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO timers (present, timer_id, fields) VALUES (?, ?, ?) "
+                "ON CONFLICT (present, timer_id) DO UPDATE SET fields = excluded.fields",
+                [(self.present, timer_id, json.dumps(fields)) for timer_id, fields in batch["timers"].items()])
+
+            # New notes go to the end for now, the order below puts them where they belong
+            self.db.executemany(
+                "INSERT INTO notes (present, timer_id, note_id, position, data) VALUES (?1, ?2, ?3, "
+                "(SELECT COALESCE(MAX(position) + 1, 0) FROM notes WHERE present = ?1 AND timer_id = ?2), ?4) "
+                "ON CONFLICT (present, timer_id, note_id) DO UPDATE SET data = excluded.data",
+                [(self.present, timer_id, note_id, blob)
+                 for timer_id, blobs in batch["notes"].items() for note_id, blob in blobs.items()])
+
+            for timer_id, order in batch["order"].items():
+                self._apply_order(timer_id, order)
+
+    def checkpoint(self):
+        """Folds the WAL back into the database file."""
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def replace(self, rows):
+        """Overwrites this present with rows shaped like load()'s return value, in one transaction."""
+        with self.db:
+            self.db.execute("DELETE FROM timers WHERE present = ?", (self.present,))
+            self.db.execute("DELETE FROM notes WHERE present = ?", (self.present,))
+            self.db.executemany(
+                "INSERT INTO timers (present, timer_id, fields) VALUES (?, ?, ?)",
+                [(self.present, timer_id, json.dumps(fields)) for timer_id, fields, _ in rows])
+            for timer_id, _, notes_json in rows:
+                self.db.executemany(
+                    "INSERT INTO notes (present, timer_id, note_id, position, data) VALUES (?, ?, ?, ?, ?)",
+                    [(self.present, timer_id, note["id"], position, json.dumps(note))
+                     for position, note in enumerate(self._notes_with_unique_ids(notes_json))])
+            if self.present != self.LIVE:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO presents (name, saved_ns) VALUES (?, ?)", (self.present, time.time_ns()))
+
+    def present_names(self):
+        return [name for (name,) in self.db.execute("SELECT name FROM presents ORDER BY name")]
+
+    def close(self):
+        self.db.close()
+
+    @staticmethod
+    def _notes_with_unique_ids(notes_json):
+        notes_data = json.loads(notes_json)
+        Note.ensure_unique_ids(notes_data)
+        return notes_data
+
+    def _has_rows(self):
+        return self.db.execute("SELECT 1 FROM timers WHERE present = ? LIMIT 1", (self.present,)).fetchone() is not None
+
+    def _apply_order(self, timer_id, order):
+        """Drops notes missing from `order` and renumbers only the ones whose position moved."""
+        positions = dict(self.db.execute(
+            "SELECT note_id, position FROM notes WHERE present = ? AND timer_id = ?", (self.present, timer_id)))
+        wanted = {note_id: position for position, note_id in enumerate(order)}
+
+        self.db.executemany(
+            "DELETE FROM notes WHERE present = ? AND timer_id = ? AND note_id = ?",
+            [(self.present, timer_id, note_id) for note_id in positions if note_id not in wanted])
+        self.db.executemany(
+            "UPDATE notes SET position = ? WHERE present = ? AND timer_id = ? AND note_id = ?",
+            [(position, self.present, timer_id, note_id)
+             for note_id, position in wanted.items() if note_id in positions and positions[note_id] != position])
+
+
+PRESENT_FILETYPES = [("Present Files", "*.ini *.db *.sqlite"), ("INI files", "*.ini"), ("SQLite files", "*.db *.sqlite")]
+
+
+class SoundProbe:
+    """
+    Reads a sound file's duration, codec and sample rate from its headers with tinytag, without
+    decoding it or opening an audio device. Results are kept in a JSON file, keyed by path and
+    reused as long as the file's mtime and size haven't changed.
+    """
+    MAX_ENTRIES = 500
+    # tinytag's parser for a file -> codec name, for the ones not named after their codec
+    CODECS = {"id3": "mp3", "wave": "wav", "mp4": "aac", "aiff": "aiff"}
+
+    def __init__(self, cache_path="SoundInfo.json", max_entries=MAX_ENTRIES, write_text=atomic_write_text):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.write_text = write_text  # write_text(path, text), e.g. a WriteBehindPersister's to keep it off the Tk thread
+        self._cache = None  # path -> {"mtime_ns", "size", "duration", "codec", "samplerate"}, read on first use
+
+    def probe(self, path):
+        """
+        Returns {"duration": seconds, "codec": str, "samplerate": Hz} for a sound file.
+        Raises OSError if it can't be read, tinytag's TinyTagException if it isn't a sound file it knows,
+        and ValueError if its headers don't describe any audio (e.g. some other file named .mp3).
+        """
+        stat = os.stat(path)
+        cache = self._load()
+        info = cache.get(path)
+        if info is None or (info["mtime_ns"], info["size"]) != (stat.st_mtime_ns, stat.st_size):
+            info = self._probe_file(path, stat)
+        if not info["duration"] or info["duration"] <= 0 or not info["samplerate"]:
+            raise ValueError("The file has no playable audio.")
+        return {key: info[key] for key in ("duration", "codec", "samplerate")}
+
+    def _probe_file(self, path, stat):
+        tag = TinyTag.get(path, tags=False)
+        parser = type(tag).__name__.strip("_").lower()
+        info = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "duration": tag.duration or 0.0,
+            "codec": self.CODECS.get(parser, parser),
+            "samplerate": tag.samplerate or 0,
+        }
+        cache = self._cache
+        cache.pop(path, None)  # Most recently probed last, so the oldest are the ones dropped
+        cache[path] = info
+        while len(cache) > self.max_entries:
+            del cache[next(iter(cache))]
+        self._save()
+        return info
+
+    def _load(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}  # No cache yet, or a broken one: it's only a cache
+        return self._cache
+
+    def _save(self):
+        try:
+            self.write_text(self.cache_path, json.dumps(self._cache))
+        except OSError as e:
+            print(f"Could not save the sound info cache: {e}")
+
+
+class AlarmSoundCache:
+    """
+    Keeps a loaded Playback for each alarm sound, so an alarm going off only has to call play()
+    instead of opening and decoding the file right at the deadline. Bounded to the most recently
+    used MAX_SOUNDS files (each holds an open decoder and audio stream), and a file that changed
+    on disk since it was loaded (mtime or size) is loaded again.
+    """
+    MAX_SOUNDS = 8
+
+    def __init__(self, max_sounds=MAX_SOUNDS):
+        self.max_sounds = max_sounds
+        self._players = collections.OrderedDict()  # path -> (mtime_ns, size, Playback), least recently used first
+
+    def get(self, path):
+        """The Playback for a sound file, loaded ahead of time if possible. Raises like Playback.load_file."""
+        stat = os.stat(path)  # FileNotFoundError for a missing file, like load_file
+        entry = self._players.get(path)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            self._players.move_to_end(path)
+            return entry[2]
+
+        # New or changed on disk. A changed file's player is loaded again rather than replaced.
+        player = entry[2] if entry is not None else Playback()
+        player.load_file(path)
+        self._players[path] = (stat.st_mtime_ns, stat.st_size, player)
+        self._players.move_to_end(path)
+        while len(self._players) > self.max_sounds:
+            _, (_, _, dropped) = self._players.popitem(last=False)
+            dropped.stop()
+        return player
+
+    def preload(self, paths):
+        """
+        Loads the sounds in `paths`, most urgent first, that aren't loaded yet. Only the first max_sounds
+        distinct ones, as more would just push each other out. Returns the paths that failed to load.
+        """
+        failed = []
+        wanted = list(dict.fromkeys(path for path in paths if path))[:self.max_sounds]
+        # The most urgent is touched last, so it's the last to be evicted
+        for path in reversed(wanted):
+            try:
+                self.get(path)
+            except Exception as e:
+                print(f"[Alarm] Could not preload '{path}': {e}")
+                failed.append(path)
+        return failed
+
+    @property
+    def playing(self):
+        return any(player.playing for _, _, player in self._players.values())
+
+    def stop(self):
+        for _, _, player in self._players.values():
+            if player.playing:
+                player.stop()
+
+
+class AudioWorker:
+    """
+    Does all the audio on a background thread, so loading a sound, a slow disk or a stuck audio
+    device never holds up the Tk thread. The Tk thread only posts commands (preload, add, stop)
+    and collects status events with events(): ("error", exception) and ("idle",) once nothing sounds.
+    Every Playback lives in the worker's AlarmSoundCache and is only touched from the worker.
+
+    Alarms queue up, one after the other, or with mix=True play together (up to MAX_MIXED at once;
+    the same file can't sound twice at once, so such alarms wait their turn). Each alarm plays its
+    rounds, each round a random pick of its sounds. The worker sleeps until the first sounding round
+    is due to end (or a command comes in), so it doesn't poll.
+    """
+    MIN_CHECK = 0.02  # Seconds. Shortest wait between looking at whether a round has finished
+    MAX_MIXED = 4
+
+    def __init__(self, sounds):
+        self.sounds = sounds  # AlarmSoundCache, only used by the worker thread from now on
+        self.mix = False
+        self._commands = collections.deque()
+        self._events = collections.deque()
+        self._closing = False
+        self._working = False  # A command was taken but isn't done yet
+        # An alarm is [sound paths, rounds left, Playback, path] - the last two only while it sounds
+        self._waiting = collections.deque()
+        self._voices = []
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="AudioWorker", daemon=True)
+        self._thread.start()
+
+    # --- Tk thread ---
+
+    def preload(self, paths):
+        """Loads every distinct sound in `paths` ahead of time, so alarms start without touching the disk."""
+        self._post("preload", list(paths))
+
+    def add(self, choices, rounds, mix=False):
+        """Plays an alarm: `rounds` rounds, each a random pick of `choices` (sound paths)."""
+        self._post("add", tuple(choices), rounds, mix)
+
+    def stop(self):
+        """Silences every alarm, sounding or waiting."""
+        self._post("stop")
+
+    def events(self):
+        """The status events that came in since the last call."""
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    @property
+    def busy(self):
+        """True while alarms are sounding or waiting, or commands haven't been handled yet."""
+        with self._cond:
+            return bool(self._commands or self._working or self._voices or self._waiting)
+
+    def close(self):
+        with self._cond:
+            self._commands.append(("stop",))
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout=2)
+
+    def _post(self, *command):
+        with self._cond:
+            self._commands.append(command)
+            self._cond.notify()
+
+    # --- Worker thread ---
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if self._commands:
+                    command = self._commands.popleft()
+                    self._working = True
+                    self._cond.release()
+                    try:
+                        getattr(self, "_do_" + command[0])(*command[1:])
+                    except Exception as e:
+                        print("Audio error:", e)
+                        self._events.append(("error", e))
+                    finally:
+                        self._cond.acquire()
+                        self._working = False
+                    continue
+
+                if self._closing:
+                    return
+                if not self._voices:
+                    self._cond.wait()
+                    continue
+
+                wait = min(self._seconds_left(voice[2]) for voice in self._voices)
+                if wait > self.MIN_CHECK:
+                    self._cond.wait(wait)
+                    continue
+
+                self._working = True
+                self._cond.release()
+                try:
+                    self._next_rounds()
+                except Exception as e:
+                    print("Audio error:", e)
+                    self._events.append(("error", e))
+                finally:
+                    self._cond.acquire()
+                    self._working = False
+
+    def _do_preload(self, paths):
+        self.sounds.preload(paths)
+
+    def _do_add(self, choices, rounds, mix):
+        self.mix = mix
+        self._waiting.append([choices, rounds, None, None])
+        self._start_waiting()
+
+    def _do_stop(self):
+        self._waiting.clear()
+        self._voices.clear()
+        self.sounds.stop()
+
+    def _next_rounds(self):
+        """Starts the next round of every alarm whose round played out, and the next alarms once some are done."""
+        finished = [voice for voice in self._voices if self._seconds_left(voice[2]) <= self.MIN_CHECK]
+        for alarm in finished:
+            # Started late or the device lagged otherwise, and it's looked at again when due
+            alarm[2].stop()
+            self._voices.remove(alarm)
+        for alarm in finished:
+            if alarm[1] > 0 and self._play(alarm) is None:
+                self._waiting.appendleft(alarm)
+        self._start_waiting()
+        if not self._voices:
+            self._events.append(("idle",))
+
+    def _start_waiting(self):
+        """Starts waiting alarms while there is room: one at a time when queueing, MAX_MIXED when mixing."""
+        room = (self.MAX_MIXED if self.mix else 1) - len(self._voices)
+        blocked = []
+        while room > 0 and self._waiting:
+            alarm = self._waiting.popleft()
+            started = self._play(alarm)
+            if started is None:
+                blocked.append(alarm)  # All its sounds are playing for other alarms
+            elif started:
+                room -= 1
+        self._waiting.extendleft(reversed(blocked))
+
+    def _play(self, alarm):
+        """
+        Starts the alarm's next round with one of its sounds that no other alarm is playing.
+        Returns True if it's sounding, None if all its sounds are busy, False if it couldn't be played.
+        """
+        busy = {voice[3] for voice in self._voices}
+        free = [path for path in alarm[0] if path not in busy]
+        if not free:
+            return None
+        random.shuffle(free)
+        for chosen_sound in free:
+            try:
+                # Normally loaded long before the deadline, see preload. A missing file fails here.
+                player = self.sounds.get(chosen_sound)
+                player.play()
+                break
+            except Exception as e:
+                print("Error playing alarm:", e)
+                self._events.append(("error", e))
+        else:
+            return False  # None of its sounds would play
+        print(f"[Alarm] Playing: {os.path.basename(chosen_sound)}")
+        alarm[1] -= 1
+        alarm[2:] = [player, chosen_sound]
+        self._voices.append(alarm)
+        return True
+
+    @staticmethod
+    def _seconds_left(player):
+        return player.duration - player.curr_pos if player.playing else 0
+
+
+class AlarmDispatcher:
+    """
+    Tk side of the alarms. Each alarm's sound goes to the AudioWorker right away, queued or mixed,
+    loop_count rounds each (0 = practically endless). The timers themselves are handed to
+    on_batch(keys) once the Tk thread is idle again, so everything that expired in the same
+    engine poll makes one notification and one save.
+    While the worker is busy, its events are collected every EVENT_POLL_MS and errors go to on_error.
+    """
+    EVENT_POLL_MS = 100
+    ENDLESS_ROUNDS = 9999
+
+    def __init__(self, root, audio, on_batch, on_error, mix=False):
+        self.root = root
+        self.audio = audio  # AudioWorker
+        self.on_batch = on_batch
+        self.on_error = on_error
+        self.mix = mix
+        self._pending = []  # Keys added since the last batch
+        self._flush_id = None
+        self._poll_id = None
+
+    def add(self, key, choices, loop_count):
+        """
+        Plays an alarm with `choices` (sound paths) loop_count times, and announces it with the next batch.
+        With no choices the alarm is only announced.
+        """
+        if choices:
+            rounds = self.ENDLESS_ROUNDS if loop_count == 0 else max(1, loop_count or 1)
+            self.audio.add(choices, rounds, self.mix)  # Not held back for the batch, it should sound right away
+        self._pending.append(key)
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self._flush)
+
+    def stop(self):
+        """Silences every alarm, sounding or waiting."""
+        self.audio.stop()
+
+    def _flush(self):
+        self._flush_id = None
+        keys, self._pending = self._pending, []
+        if self._poll_id is None:
+            self._poll_events()
+        self.on_batch(keys)
+
+    def _poll_events(self):
+        self._poll_id = None
+        errors = [event[1] for event in self.audio.events() if event[0] == "error"]
+        if errors:
+            self.on_error(errors)
+        if self.audio.busy:
+            self._poll_id = self.root.after(self.EVENT_POLL_MS, self._poll_events)
 
 
 class TimerSwitcher(tk.Frame):
-    def __init__(self, master, switch_callback):
+    def __init__(self, master, timers, switch_callback, add_callback):
         super().__init__(master, bg="#1e1e1e")
+        self.timers = timers
         self.switch_callback = switch_callback
-        self.current_timer = 0
-        self.timer_titles = [f"Timer {i + 1}" for i in range(8)]
+        self.add_callback = add_callback
+        self.current_timer = timers.id_at(0)
 
         btn_style = {"bg": "#2e2e2e", "fg": "white", "activebackground": "#008B8B", "activeforeground": "white",
                      "relief": "flat"}
         self.left_btn = tk.Button(self, text="<", command=self.prev_timer, width=3, **btn_style)
         self.left_btn.grid(row=0, column=0, padx=(10, 5), pady=5)
 
-        self.timer_id_label = tk.Label(self, text="Timer 1", font=("Helvetica", 12), fg="white", bg="#1e1e1e")
+        # Clicking the label opens the searchable list of all timers
+        self.timer_id_label = tk.Button(self, text="Timer 1 \u25BE", font=("Helvetica", 12), command=self.open_picker,
+                                        **btn_style)
         self.timer_id_label.grid(row=0, column=1)
 
         self.right_btn = tk.Button(self, text=">", command=self.next_timer, width=3, **btn_style)
-        self.right_btn.grid(row=0, column=2, padx=(5, 10), pady=5)
+        self.right_btn.grid(row=0, column=2, padx=(5, 0), pady=5)
+
+        self.add_btn = tk.Button(self, text="+", command=self.add_callback, width=3, **btn_style)
+        self.add_btn.grid(row=0, column=3, padx=(5, 10), pady=5)
 
-        self.title_var = tk.StringVar(value=self.timer_titles[self.current_timer])
+        self.title_var = tk.StringVar(value=self.timers.titles[self.current_timer])
         self.title_entry = tk.Entry(self, textvariable=self.title_var, font=("Helvetica", 12), width=25,
                                     justify="center",
                                     bg="#2e2e2e", fg="white", relief="flat", insertbackground="white",
                                     highlightthickness=1, highlightbackground="#00CED1", highlightcolor="#00CED1")
-        self.title_entry.grid(row=1, column=0, columnspan=3, pady=(2, 8))
+        self.title_entry.grid(row=1, column=0, columnspan=4, pady=(2, 8))
 
         self.title_var.trace_add("write", self.update_title)
 
     def prev_timer(self):
-        self.current_timer = (self.current_timer - 1) % 8
+        self.current_timer = self.timers.id_at(self.timers.position(self.current_timer) - 1)
         self.load_timer()
 
     def next_timer(self):
-        self.current_timer = (self.current_timer + 1) % 8
+        self.current_timer = self.timers.id_at(self.timers.position(self.current_timer) + 1)
         self.load_timer()
 
+    def select_timer(self, timer_id):
+        if timer_id != self.current_timer:
+            self.current_timer = timer_id
+            self.load_timer()
+
+    def open_picker(self):
+        TimerPicker(self)
+
     def load_timer(self):
-        self.timer_id_label.config(text=f"Timer {self.current_timer + 1}")
-        self.title_var.set(self.timer_titles[self.current_timer])
+        self.timer_id_label.config(text=f"Timer {self.current_timer + 1} \u25BE")
+        self.title_var.set(self.timers.titles[self.current_timer])
         self.switch_callback(self.current_timer)
 
     def update_title(self, *args):
-        self.timer_titles[self.current_timer] = self.title_var.get()
+        if self.timers.titles[self.current_timer] != self.title_var.get():
+            self.timers.titles[self.current_timer] = self.title_var.get()
+            self.timers.mark_dirty(self.current_timer)
+
+
+class TimerPicker(tk.Toplevel):
+    """A searchable, paged list of every timer. Double-click or Enter jumps to one."""
+    PAGE_SIZE = 50
+
+    def __init__(self, switcher):
+        super().__init__(switcher)
+        self.switcher = switcher
+        self.timers = switcher.timers
+        self.matches = []
+        self.page = 0
+        self.page_ids = []
+
+        self.title("Go to Timer")
+        self.geometry("320x400")
+        self.configure(bg="#1e1e1e")
+        self.resizable(False, False)
+        self.transient(switcher.winfo_toplevel())
+        self.grab_set()
+
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(self, textvariable=self.search_var, font=("Helvetica", 12), bg="#2e2e2e", fg="white",
+                                insertbackground="white", relief="flat", highlightthickness=1,
+                                highlightbackground="#00CED1", highlightcolor="#00CED1")
+        search_entry.pack(fill="x", padx=10, pady=(10, 5))
+        search_entry.focus_set()
+
+        self.listbox = tk.Listbox(self, bg="#1e1e1e", fg="white", selectbackground="#4a4a9f",
+                                  highlightthickness=0, borderwidth=1, relief="solid", font=("Consolas", 11))
+        self.listbox.pack(fill="both", expand=True, padx=10)
+
+        pager = tk.Frame(self, bg="#1e1e1e")
+        pager.pack(fill="x", padx=10, pady=5)
+        btn_style = {"bg": "#2e2e2e", "fg": "white", "activebackground": "#008B8B", "activeforeground": "white",
+                     "relief": "flat", "width": 3}
+        tk.Button(pager, text="<", command=lambda: self.show_page(self.page - 1), **btn_style).pack(side="left")
+        self.page_label = tk.Label(pager, text="", bg="#1e1e1e", fg="white")
+        self.page_label.pack(side="left", expand=True)
+        tk.Button(pager, text=">", command=lambda: self.show_page(self.page + 1), **btn_style).pack(side="right")
+
+        self.listbox.bind("<Double-1>", self.choose)
+        self.bind("<Return>", self.choose)
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.search_var.trace_add("write", lambda *args: self.apply_filter())
+
+        self.apply_filter()
+
+    def apply_filter(self):
+        self.matches = self.timers.search(self.search_var.get())
+        # Open on the page holding the current timer when nothing is typed
+        page = 0
+        if not self.search_var.get().strip():
+            page = self.timers.position(self.switcher.current_timer) // self.PAGE_SIZE
+        self.show_page(page)
+
+    def show_page(self, page):
+        page_count = max(1, math.ceil(len(self.matches) / self.PAGE_SIZE))
+        self.page = max(0, min(page, page_count - 1))
+        start = self.page * self.PAGE_SIZE
+        self.page_ids = self.matches[start:start + self.PAGE_SIZE]
+
+        self.listbox.delete(0, tk.END)
+        for timer_id in self.page_ids:
+            marker = "\u25CF " if self.timers[timer_id].get("running") else "  "
+            self.listbox.insert(tk.END, f"{marker}{timer_id + 1:>4}  {self.timers.titles[timer_id]}")
+
+        if self.switcher.current_timer in self.page_ids:
+            row = self.page_ids.index(self.switcher.current_timer)
+        else:
+            row = 0
+        if self.page_ids:
+            self.listbox.selection_set(row)
+            self.listbox.see(row)
+        self.page_label.config(text=f"{len(self.matches)} timers  -  page {self.page + 1}/{page_count}")
+
+    def choose(self, event=None):
+        selected = self.listbox.curselection()
+        if not selected:
+            return
+        timer_id = self.page_ids[selected[0]]
+        self.destroy()
+        self.switcher.select_timer(timer_id)
+
+
+class VirtualListbox(tk.Canvas):
+    """
+    A Listbox look-alike that only draws the rows in view. Rows aren't stored in the widget:
+    the count comes from row_count() and each visible row's text from row_text(index), so a
+    handful of canvas items get reused while scrolling, whether there are 20 rows or 50,000.
+    It supports the part of the Listbox API the notes panel uses (selection, see, nearest, yview).
+    With selectmode="extended", Ctrl+click toggles a row, Shift+click selects a range and Ctrl+A selects all.
+    """
+
+    def __init__(self, master, row_count, row_text, font, fg="white", selectbackground="#4a4a9f",
+                 selectmode="browse", **kwargs):
+        self.font = tkFont.Font(root=master, font=font)
+        self.row_height = self.font.metrics("linespace") + 2
+        # Same natural size as a default Listbox: 20 characters by 10 rows
+        kwargs.setdefault("width", self.font.measure("0") * 20)
+        kwargs.setdefault("height", self.row_height * 10)
+        super().__init__(master, **kwargs)
+        self.row_count = row_count
+        self.row_text = row_text
+        self.fg = fg
+        self.selectbackground = selectbackground
+        self.selectmode = selectmode
+        self.top = 0  # Index of the first visible row
+        self.selected = set()
+        self.active = None
+        self.anchor = None  # Where a Shift+click range starts
+        self.yscrollcommand = None
+        self._slots = []  # (highlight rectangle, text) canvas items, reused for whatever rows are visible
+
+        self.bind("<Configure>", lambda e: self.redraw())
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<MouseWheel>", lambda e: self.yview_scroll(-3 if e.delta > 0 else 3, "units"))
+        self.bind("<Button-4>", lambda e: self.yview_scroll(-3, "units"))  # Wheel on X11
+        self.bind("<Button-5>", lambda e: self.yview_scroll(3, "units"))
+        self.bind("<Up>", lambda e: self._move_selection(-1))
+        self.bind("<Down>", lambda e: self._move_selection(1))
+        if selectmode == "extended":
+            self.bind("<Control-Button-1>", self._on_control_click)
+            self.bind("<Shift-Button-1>", self._on_shift_click)
+            self.bind("<Control-a>", self._select_all)
+
+    def configure(self, cnf=None, **kwargs):
+        # The scrollbar follows our rows, not the canvas' own scroll region
+        if "yscrollcommand" in kwargs:
+            self.yscrollcommand = kwargs.pop("yscrollcommand")
+            self.redraw()
+        return super().configure(cnf, **kwargs)
+
+    config = configure
+
+    # --- Listbox API ---
+
+    def size(self):
+        return self.row_count()
+
+    def curselection(self):
+        return tuple(sorted(self.selected))
+
+    def selection_set(self, first, last=None):
+        self.selected.update(self._range(first, last))
+        self.redraw()
+
+    def selection_clear(self, first, last=None):
+        self.selected.difference_update(self._range(first, last))
+        self.redraw()
+
+    def activate(self, index):
+        self.active = self._index(index)
+
+    def see(self, index):
+        index = self._index(index)
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self._full_rows():
+            self.top = index - self._full_rows() + 1
+        self.redraw()
+
+    def nearest(self, y):
+        count = self.row_count()
+        if not count:
+            return -1
+        return min(count - 1, self.top + max(0, y) // self.row_height)
+
+    def yview(self, *args):
+        if not args:
+            count = self.row_count()
+            if not count:
+                return 0.0, 1.0
+            return self.top / count, min(1.0, (self.top + self._full_rows()) / count)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.row_count())
+            self.redraw()
+        elif args[0] == "scroll":
+            self.yview_scroll(int(args[1]), args[2])
+
+    def yview_scroll(self, number, what):
+        self.top += number * (self._full_rows() if what == "pages" else 1)
+        self.redraw()
+
+    # --- Data changes ---
+
+    def refresh(self):
+        """Redraws after the rows changed, dropping selected rows that no longer exist."""
+        count = self.row_count()
+        self.selected = {index for index in self.selected if index < count}
+        self.redraw()
+
+    def reset(self):
+        """Back to the top with nothing selected, for when a whole different list is shown."""
+        self.top = 0
+        self.selected.clear()
+        self.active = None
+        self.anchor = None
+        self.redraw()
+
+    def redraw(self):
+        count = self.row_count()
+        visible = self.winfo_height() // self.row_height + 1
+        self.top = max(0, min(self.top, count - self._full_rows()))
+
+        while len(self._slots) < visible:
+            self._slots.append((self.create_rectangle(0, 0, 0, 0, width=0, fill=self.selectbackground),
+                                self.create_text(0, 0, anchor="nw", font=self.font, fill=self.fg)))
+
+        width = self.winfo_width()
+        for slot, (highlight, text) in enumerate(self._slots):
+            index = self.top + slot
+            if slot >= visible or index >= count:
+                self.itemconfigure(highlight, state="hidden")
+                self.itemconfigure(text, state="hidden")
+                continue
+
+            y = slot * self.row_height + 1
+            self.coords(highlight, 0, y, width, y + self.row_height)
+            self.itemconfigure(highlight, state="normal" if index in self.selected else "hidden")
+            self.coords(text, 2, y + 1)
+            self.itemconfigure(text, text=self.row_text(index), state="normal")
+
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.yview())
+
+    def _full_rows(self):
+        return max(1, self.winfo_height() // self.row_height)
+
+    def _index(self, index):
+        return self.row_count() - 1 if index == tk.END else int(index)
+
+    def _range(self, first, last):
+        first = self._index(first)
+        last = first if last is None else self._index(last)
+        return range(first, last + 1)
+
+    def _select(self, index):
+        self.selected = {index}
+        self.active = self.anchor = index
+        self.see(index)
+        self.event_generate("<<ListboxSelect>>")
+
+    def _on_control_click(self, event):
+        self.focus_set()
+        index = self.nearest(event.y)
+        if index >= 0:
+            self.selected ^= {index}
+            self.active = self.anchor = index
+            self.redraw()
+            self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _on_shift_click(self, event):
+        self.focus_set()
+        index = self.nearest(event.y)
+        if index >= 0:
+            anchor = self.anchor if self.anchor is not None else index
+            self.selected = set(range(min(anchor, index), max(anchor, index) + 1))
+            self.active = index
+            self.redraw()
+            self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _select_all(self, event=None):
+        count = self.row_count()
+        if count:
+            self.selected = set(range(count))
+            self.redraw()
+            self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _on_click(self, event):
+        self.focus_set()
+        index = self.nearest(event.y)
+        if index >= 0:
+            self._select(index)
+
+    def _move_selection(self, step):
+        count = self.row_count()
+        if count:
+            current = self.active if self.active is not None else -step
+            self._select(max(0, min(count - 1, current + step)))
+
+
+class NoteSearch(tk.Toplevel):
+    """Searches the notes of every timer. Double-click or Enter switches to the timer with that note selected."""
+    MAX_RESULTS = 100
+
+    def __init__(self, app):
+        super().__init__(app.root)
+        self.app = app
+        self.hits = []
+
+        self.title("Find Note")
+        self.geometry("360x400")
+        self.configure(bg="#1e1e1e")
+        self.resizable(False, False)
+        self.transient(app.root)
+        self.grab_set()
+
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(self, textvariable=self.search_var, font=("Helvetica", 12), bg="#2e2e2e", fg="white",
+                                insertbackground="white", relief="flat", highlightthickness=1,
+                                highlightbackground="#00CED1", highlightcolor="#00CED1")
+        search_entry.pack(fill="x", padx=10, pady=(10, 5))
+        search_entry.focus_set()
+
+        self.listbox = tk.Listbox(self, bg="#1e1e1e", fg="white", selectbackground="#4a4a9f",
+                                  highlightthickness=0, borderwidth=1, relief="solid", font=("Consolas", 11))
+        self.listbox.pack(fill="both", expand=True, padx=10)
+
+        self.status_label = tk.Label(self, text="", bg="#1e1e1e", fg="white")
+        self.status_label.pack(fill="x", padx=10, pady=5)
+
+        self.listbox.bind("<Double-1>", self.choose)
+        self.bind("<Return>", self.choose)
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.search_var.trace_add("write", lambda *args: self.run_search())
+
+    def run_search(self):
+        self.hits = self.app.timers.search_notes(self.search_var.get(), self.MAX_RESULTS)
+
+        self.listbox.delete(0, tk.END)
+        for _, timer_id, _, note_title in self.hits:
+            self.listbox.insert(tk.END, f"{self.app.timers.titles[timer_id][:12]:<12}  {note_title}")
+        if self.hits:
+            self.listbox.selection_set(0)
+
+        more = "+" if len(self.hits) == self.MAX_RESULTS else ""
+        self.status_label.config(text=f"{len(self.hits)}{more} notes found" if self.search_var.get().strip() else "")
+
+    def choose(self, event=None):
+        selected = self.listbox.curselection()
+        if not selected:
+            return
+        _, timer_id, note_id, _ = self.hits[selected[0]]
+        self.destroy()
+        self.app.show_note(timer_id, note_id)
+
+
+class FontRegistry:
+    """
+    A bounded LRU cache of Tk fonts keyed by (family, size, weight, slant, underline), shared by every
+    editor and viewer. Each tkFont.Font is a named Tk font, so making a new one per cursor move or
+    per run is slow and piles up fonts. A font dropped from the cache is deleted by tkinter once
+    unreferenced; text already using it keeps its look (Tk only frees it when nothing uses it).
+    """
+    MAX_FONTS = 64
+
+    def __init__(self, max_fonts=MAX_FONTS):
+        self.max_fonts = max_fonts
+        self._fonts = collections.OrderedDict()  # key -> Font, least recently used first
+        self._keys = {}  # font name or description, as Tk reports it -> key
+
+    def get(self, family, size, weight="normal", slant="roman", underline=0):
+        key = (family, int(size), weight, slant, 1 if underline else 0)
+        font = self._fonts.get(key)
+        if font is None:
+            font = tkFont.Font(family=family, size=size, weight=weight, slant=slant, underline=key[4])
+            self._fonts[key] = font
+            self._keys[font.name] = key
+            if len(self._fonts) > self.max_fonts:
+                self._fonts.popitem(last=False)
+        else:
+            self._fonts.move_to_end(key)
+        return font
+
+    def from_spec(self, spec):
+        """The font for a font.actual()-style dict, as saved in note styles."""
+        return self.get(spec.get("family", "Arial"), spec.get("size", 10), spec.get("weight", "normal"),
+                        spec.get("slant", "roman"), spec.get("underline", 0))
+
+    def lookup(self, description):
+        """The font for a font name or description as Tk reports it, e.g. tag_cget(tag, "font")."""
+        description = str(description)
+        key = self._keys.get(description)
+        if key is None:
+            # Not one of ours (a widget's own font, an old saved string): resolve it once
+            spec = tkFont.Font(font=description).actual()
+            key = self._keys[description] = (spec["family"], spec["size"], spec["weight"], spec["slant"],
+                                             1 if spec["underline"] else 0)
+        return self.get(*key)
+
+
+NOTE_FONTS = FontRegistry()
+
+
+def apply_note_styles(text_widget, note):
+    """
+    Formats a Text widget holding a note's description with one tag_configure and one tag_add
+    per style, however many runs use it.
+    """
+    for style_id, indexes in note.ranges_by_style().items():
+        tag_name, config = NOTE_STYLES[style_id]
+        if "font" in config:
+            font_data = config["font"]
+            # Handle both new dicts and old strings
+            if isinstance(font_data, dict):
+                text_widget.tag_configure(tag_name, font=NOTE_FONTS.from_spec(font_data))
+            else:  # Failsafe to old string format
+                text_widget.tag_configure(tag_name, font=font_data)
+        elif "foreground" in config:
+            text_widget.tag_configure(tag_name, foreground=config["foreground"])
+
+        text_widget.tag_add(tag_name, *indexes)
 
 
 class NoteEditor(tk.Toplevel):
@@ -296,7 +2393,7 @@ class NoteEditor(tk.Toplevel):
                 new_slant = current_font.actual("slant")
                 new_underline = 0 if current_font.actual("underline") else 1
 
-            new_font = tkFont.Font(
+            new_font = NOTE_FONTS.get(
                 family=current_font.actual("family"),
                 size=current_font.actual("size"),
                 weight=new_weight,
@@ -314,10 +2411,10 @@ class NoteEditor(tk.Toplevel):
         for tag in reversed(self.desc_text.tag_names(index)):
             if tag.startswith("font_"):
                 font_config = self.desc_text.tag_cget(tag, "font")
-                return tkFont.Font(font=font_config)
+                return NOTE_FONTS.lookup(font_config)
 
         # If no specific font tag is found, return the widget's default font
-        return tkFont.Font(font=self.desc_text.cget("font"))
+        return NOTE_FONTS.lookup(self.desc_text.cget("font"))
 
     def apply_font_to_selection(self, new_font):
         """Creates a unique tag for a font and applies it to the current selection."""
@@ -351,7 +2448,7 @@ class NoteEditor(tk.Toplevel):
         """Applies the font family from the dropdown to the selected text."""
         try:
             current_font = self.get_font_at_index("sel.first")
-            new_font = tkFont.Font(
+            new_font = NOTE_FONTS.get(
                 family=selected_family,
                 size=current_font.actual("size"),
                 weight=current_font.actual("weight"),
@@ -374,7 +2471,7 @@ class NoteEditor(tk.Toplevel):
             new_size = self.font_size_var.get()
             current_font = self.get_font_at_index("sel.first")
 
-            new_font = tkFont.Font(
+            new_font = NOTE_FONTS.get(
                 family=current_font.actual("family"),
                 size=new_size,
                 weight=current_font.actual("weight"),
@@ -437,7 +2534,8 @@ class NoteEditor(tk.Toplevel):
             return
 
         description_text = self.desc_text.get("1.0", "end-1c")
-        description_tags = []
+        # One tag_ranges call per tag, however many runs it has
+        styled_ranges = []
         for tag in self.desc_text.tag_names():
             if tag == "sel": continue
 
@@ -446,14 +2544,13 @@ class NoteEditor(tk.Toplevel):
 
             config = {}
             if tag.startswith("font_"):
-                font_obj = tkFont.Font(font=self.desc_text.tag_cget(tag, "font"))
+                font_obj = NOTE_FONTS.lookup(self.desc_text.tag_cget(tag, "font"))
                 config["font"] = font_obj.actual()  # Save as a proper dictionary
             elif tag.startswith("fg_"):
                 config["foreground"] = self.desc_text.tag_cget(tag, "foreground")
 
             if config:
-                for start, end in zip(ranges[::2], ranges[1::2]):
-                    description_tags.append((tag, str(start), str(end), config))
+                styled_ranges.append((tag, config, [str(index) for index in ranges]))
 
         completion_type = self.completion_type_var.get()
         completion_data = None
@@ -481,12 +2578,13 @@ class NoteEditor(tk.Toplevel):
 
         if self.note_to_edit:
             note = self.note_to_edit
+            before = note.state()
             note.title = title
             note.description_text = description_text
-            note.description_tags = description_tags
+            note.set_style_ranges(styled_ranges)
             note.completion_type = completion_type
             note.completion_data = completion_data
-            self.parent_app.update_existing_note(note)
+            self.parent_app.update_existing_note(note, before=before)
         else:
             # Create a new note with all the data
             new_note = Note(
@@ -495,7 +2593,7 @@ class NoteEditor(tk.Toplevel):
                 completion_type=completion_type,
                 completion_data=completion_data
             )
-            new_note.description_tags = description_tags
+            new_note.set_style_ranges(styled_ranges)
             self.parent_app.add_new_note_to_current_timer(new_note)
 
         self.destroy()
@@ -506,18 +2604,7 @@ class NoteEditor(tk.Toplevel):
         self.desc_text.insert("1.0", self.note_to_edit.description_text)
 
         # Apply all saved tags
-        for tag_name, start, end, config in self.note_to_edit.description_tags:
-            if "font" in config:
-                font_data = config["font"]
-                # Handle both new dicts and old strings
-                if isinstance(font_data, dict):
-                    self.desc_text.tag_configure(tag_name, font=tkFont.Font(**font_data))
-                else:  # Failsafe to old string format
-                    self.desc_text.tag_configure(tag_name, font=font_data)
-            elif "foreground" in config:
-                self.desc_text.tag_configure(tag_name, foreground=config["foreground"])
-
-            self.desc_text.tag_add(tag_name, start, end)
+        apply_note_styles(self.desc_text, self.note_to_edit)
 
         self.completion_type_var.set(self.note_to_edit.completion_type)
 
@@ -600,17 +2687,7 @@ class NoteViewer(tk.Toplevel):
         desc_text.config(state="normal")
         desc_text.insert("1.0", self.note.description_text)
 
-        for tag_name, start, end, config in self.note.description_tags:
-            if "font" in config:
-                font_data = config["font"]
-                if isinstance(font_data, dict):
-                    desc_text.tag_configure(tag_name, font=tkFont.Font(**font_data))
-                else:
-                    desc_text.tag_configure(tag_name, font=font_data)
-            elif "foreground" in config:
-                desc_text.tag_configure(tag_name, foreground=config["foreground"])
-
-            desc_text.tag_add(tag_name, start, end)
+        apply_note_styles(desc_text, self.note)
 
         desc_text.config(state="disabled")
 
@@ -659,8 +2736,9 @@ class NoteViewer(tk.Toplevel):
     def update_checkbox_value(self):
         """Saves the new state of the note's checkbox."""
         new_state = self.checkbox_var.get()
+        before = self.note.state()
         self.note.completion_data = new_state
-        self.parent_app.update_existing_note(self.note)
+        self.parent_app.update_existing_note(self.note, before=before)
 
     def build_digits_completion(self):
         data = self.note.completion_data
@@ -700,8 +2778,9 @@ class NoteViewer(tk.Toplevel):
             if new_value != clamped_value:
                 self.current_digit_var.set(clamped_value)
 
+            before = self.note.state()
             self.note.completion_data[0] = clamped_value
-            self.parent_app.update_existing_note(self.note)
+            self.parent_app.update_existing_note(self.note, before=before)
         except tk.TclError:
             # Handle case where user enters non-integer
             self.current_digit_var.set(self.note.completion_data[0])
@@ -739,10 +2818,13 @@ class NoteViewer(tk.Toplevel):
             self.note_index += 1  # Update our internal index down
 
 class TimerApp:
+    TOOLTIP_DELAY_MS = 50  # Mouse motion over the notes list is handled at most this often
+    MAX_SOUND_SECONDS = 12  # Longest alarm sound the pickers accept
+    MAX_LISTED_ALARMS = 8  # Timers named in one "finished" popup, the rest are counted
+
     def __init__(self, root):
         self.alarm_playing = None
         self.loop_count = 1
-        self.config_busy = False
         self.present_path = None
         self.pause_flash_state = False
         # --- Default Sound Paths ---
@@ -769,22 +2851,27 @@ class TimerApp:
         except Exception as e:
             print(f"Error setting application icon: {e}")
 
-        self.timer_switcher = TimerSwitcher(self.root, self.switch_timer)
-        self.timer_switcher.pack(pady=(10, 0))
-
-
-
         # Initialize timer data placeholders
         # Each timer has a 'notes' list associated with it
-        self.all_timers_data = [{"notes": []} for _ in range(8)]
-        self.timer_fired_flags = [False for _ in range(8)]
-        self.current_timer_id = 0
+        self.timers = TimerStore()
+        self.engine = TimerEngine(self.timers)
+        self.current_timer_id = self.timers.id_at(0)
 
-        # This will hold the notes for the CURRENTLY active timer
-        self.notes = []
+        self.timer_switcher = TimerSwitcher(self.root, self.timers, self.switch_timer, self.add_timer)
+        self.timer_switcher.pack(pady=(10, 0))
 
-        self.audio_player = Playback()
-        self.alarm_loop_counter = 0
+        # This will hold the notes for the CURRENTLY active timer
+        self.notes = NoteList()
+        self.history = UndoHistory()  # Note adds, deletes, moves and edits, across all timers
+
+        # Sounds are loaded and played on their own thread, the Tk thread only sends it commands
+        self.audio = AudioWorker(AlarmSoundCache())
+        self.preload_after_id = None  # Pending preload of the next timers' sounds
+        # Alarms going off together are played and announced as one batch
+        self.mix_alarms_var = tk.BooleanVar(value=False)
+        self.alarms = AlarmDispatcher(root, self.audio, self.on_alarm_batch, self.on_alarm_errors)
+        self.finished_popup = None
+        self.finished_timers = []  # Timers listed in finished_popup
 
         self.week_seconds = 7 * 24 * 3600
 
@@ -794,21 +2881,41 @@ class TimerApp:
         self.sec_var = tk.IntVar()
         self.update_timer_var = tk.BooleanVar()
 
-        self.end_time = None
-        self.paused = False
-        self.pause_time = None
-        self.remaining_duration = None
-        self.timer_running = False
+        # SQLite is opt-in (--sqlite), and sticks once CurrentTimer.db exists. Its first load imports the INI state.
+        if "--sqlite" in sys.argv or os.path.exists("CurrentTimer.db"):
+            self.timer_file = "CurrentTimer.db"
+            self.state_file = SqliteState(self.timer_file, migrate_from="CurrentTimer.ini")
+        else:
+            self.timer_file = "CurrentTimer.ini"
+            self.state_file = JournaledIniState(self.timer_file)
+        self.persister = WriteBehindPersister()
+        # Durations for the sound pickers, without loading the files. Its cache is saved in the background too.
+        self.sound_probe = SoundProbe(write_text=self.persister.write_text)
 
-        self.timer_file = "CurrentTimer.ini"
+        # One after() for the next expiry of any timer, one for the next visible second of the current one
+        self.scheduler = DeadlineScheduler(self.root, self.engine)
+        self.engine.subscribe(self.on_engine_event)
+        self.display_after_id = None
 
         self.build_ui()
         self.load_timer_from_memory()
         self.try_restore_timer()
 
-        self.check_all_timers()
         self.setup_listbox_tooltip()
 
+    # The running state of the displayed timer is owned by the engine, these are just shortcuts
+    @property
+    def timer_running(self):
+        return self.engine.is_running(self.current_timer_id)
+
+    @property
+    def paused(self):
+        return self.engine.is_paused(self.current_timer_id)
+
+    @property
+    def pause_ns(self):
+        return self.timers[self.current_timer_id].get("pause_ns")
+
     @staticmethod
     def resource_path(relative_path):
         """ Get absolute path to resource """
@@ -844,7 +2951,7 @@ class TimerApp:
 
     def mark_selected_note(self, increment=True):
         """
-        Handles the 'Mark' and 'Unmark' buttons.
+        Handles the 'Mark' and 'Unmark' buttons, for every selected note at once.
         - For Checkboxes: Marks or unmarks the note.
         - For Digits: Increments or decrements the current value.
         - For Plain Text: Does nothing. What? You want them to grow or shrink? Nah.
@@ -854,26 +2961,30 @@ class TimerApp:
             messagebox.showwarning("No Selection", "Please select a note to modify.")
             return
 
-        note_index = selected_indices[0]
-        note = self.notes[note_index]
+        ops = []
+        for note_index in selected_indices:
+            note = self.notes[note_index]
+            before = note.state()
 
-        if note.completion_type == "Checkboxes":
-            note.completion_data = increment # True for Mark, False for Unmark
-
-        elif note.completion_type == "Digits/Full Digits":
-            current, min_val, max_val = note.completion_data
-            if increment: # Mark Note = Increment
-                if current < max_val:
-                    note.completion_data[0] += 1
-            else: # Unmark Note = Decrement
-                if current > min_val:
-                    note.completion_data[0] -= 1
-        else:
-            return
+            if note.completion_type == "Checkboxes":
+                note.completion_data = increment # True for Mark, False for Unmark
 
-        self.update_existing_note(note)
-        self.notes_listbox.selection_set(note_index)
-        self.notes_listbox.activate(note_index)
+            elif note.completion_type == "Digits/Full Digits":
+                current, min_val, max_val = note.completion_data
+                if increment: # Mark Note = Increment
+                    if current < max_val:
+                        note.completion_data[0] += 1
+                else: # Unmark Note = Decrement
+                    if current > min_val:
+                        note.completion_data[0] -= 1
+            else:
+                continue
+
+            ops.append(self._note_updated(note, before))
+
+        # One history entry, one redraw and one save for the whole selection
+        self.record_note_ops(ops)
+        self.commit_note_changes()
 
     def draw_stopwatch(self, canvas):
         """Draws a vector stopwatch on the provided canvas."""
@@ -999,18 +3110,40 @@ class TimerApp:
                                fg="white")
         notes_label.pack(side="left", padx=(0, 10))  # Added padding
 
+        self.find_note_btn = tk.Button(notes_header_frame, text="Find", font=("Helvetica", 10, "bold"),
+                                       bg="#2e2e2e", fg="white", activebackground="#008B8B",
+                                       activeforeground="white", command=self.open_note_search,
+                                       relief="flat", highlightthickness=1, highlightbackground="#00CED1")
+        self.find_note_btn.pack(side="left")
+        self.root.bind("<Control-f>", lambda e: self.open_note_search())
+
+        history_btn_style = {"font": ("Helvetica", 10, "bold"), "bg": "#2e2e2e", "fg": "white",
+                             "activebackground": "#008B8B", "activeforeground": "white", "relief": "flat",
+                             "width": 2}
+        tk.Button(notes_header_frame, text="\u21B7", command=self.redo, **history_btn_style).pack(side="right", padx=(0, 5))
+        tk.Button(notes_header_frame, text="\u21B6", command=self.undo, **history_btn_style).pack(side="right", padx=2)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        self.root.bind("<Control-Z>", self.redo)  # Ctrl+Shift+Z
+
         # Frame for the listbox and its scrollbar
         list_frame = tk.Frame(self.notes_panel, bg="#2a2a2a")
         list_frame.grid(row=1, column=0, sticky="nsew", padx=5)
         list_frame.grid_rowconfigure(0, weight=1)
         list_frame.grid_columnconfigure(0, weight=1)
 
-        self.notes_listbox = tk.Listbox(list_frame, bg="#1e1e1e", fg="white", selectbackground="#4a4a9f",
-                                        highlightthickness=0, borderwidth=1, relief="solid",
-                                        font=("Consolas", 15))
+        # Virtual: only the visible rows are drawn, straight from self.notes
+        self.notes_listbox = VirtualListbox(list_frame, row_count=lambda: len(self.notes),
+                                            row_text=lambda index: self.notes[index].display_text(),
+                                            font=("Consolas", 15), fg="white", selectbackground="#4a4a9f",
+                                            selectmode="extended", bg="#1e1e1e", highlightthickness=0, borderwidth=1, relief="solid")
         self.notes_listbox.grid(row=0, column=0, sticky="nsew")
         self.notes_listbox.bind("<Double-1>", self.open_note_viewer)
         self.notes_listbox.bind("<<ListboxSelect>>", self.on_note_selection_change)
+        # Bulk edits on whatever is selected
+        self.notes_listbox.bind("<Delete>", lambda e: self.delete_selected_note())
+        self.notes_listbox.bind("<Alt-Up>", lambda e: self.move_selected_notes("up"))
+        self.notes_listbox.bind("<Alt-Down>", lambda e: self.move_selected_notes("down"))
 
         scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.notes_listbox.yview,
                                  bg="#2e2e2e", troughcolor="#1e1e1e", activebackground="#008B8B")
@@ -1153,6 +3286,7 @@ class TimerApp:
         self.menu.add_cascade(label="Options", menu=options_menu)
         options_menu.add_command(label="Loop...", command=self.set_loop)
         options_menu.add_command(label="Change Sound...", command=self.choose_sound)
+        options_menu.add_checkbutton(label="Mix Simultaneous Alarms", variable=self.mix_alarms_var)
 
     def normalize_time_event(self, event=None):
         self.normalize_time()
@@ -1171,27 +3305,11 @@ class TimerApp:
         self.sec_var.set(seconds)
 
     def start_timer(self):
-        if self.config_busy:
-            return
-
-        if self.start_btn.cget("text") == "Stop":
-            # 1. Reset the current state variables for the current timer.
-            # The duration values (days, hours, etc.) are kept as they are.
-            self.timer_running = False
-            self.paused = False
-            self.end_time = None
-            self.pause_time = None
-            self.remaining_duration = None
-            self.timer_fired_flags[self.current_timer_id] = False
-
-            # 2. Update the UI to reflect the "stopped" state.
-            self.start_btn.config(text='Start')
-            self.pause_btn.config(text='Pause', state='disabled')
-            self.update_check.config(state='disabled')
-            self.enable_spinboxes()
-            self.update_timer_canvas("00:00:00", color_main="white")
+        if self.timer_running:
+            # The button reads "Stop". The duration values (days, hours, etc.) are kept as they are.
+            self.engine.stop(self.current_timer_id)
 
-            # 3. Save the new state of ALL timers.
+            # Save the new state of ALL timers.
             # This will update the now-stopped timer in the CurrentTimer.ini file
             # while preserving the state of all other timers.
             # I suck at programming. I know.
@@ -1207,123 +3325,145 @@ class TimerApp:
             messagebox.showwarning("Invalid Time", "Please set a duration greater than 0.")
             return
 
-        self.end_time = datetime.now() + timedelta(seconds=total_seconds)
-        self.remaining_duration = timedelta(seconds=total_seconds)
-        self.paused = False
-        self.timer_running = True
+        self.save_current_timer_to_memory()
+        self.engine.start(self.current_timer_id, total_seconds * NS_PER_SEC)
 
         # Save the initial running state for all timers to the file
         # Ignore the "current" word.
         self.save_current_timer_state()
 
-        self.start_btn.config(text='Stop', state='normal')
-        self.pause_btn.config(state='normal', text='Pause')
-
-        self.disable_spinboxes()
-        self.update_check.config(state='disabled')
-        self.update_timer_var.set(False)
-
-        self.update_timer()
-
     def toggle_pause(self):
-        if self.config_busy:
-            return
         if not self.timer_running:
             return
 
         if not self.paused:
             # --- Pausing the timer ---
-            self.paused = True
-            self.start_btn.config(text='Stop', state='normal')
-            self.pause_time = datetime.now()
-
-            # --- Sync memory with the new "paused" state ---
-            self.save_current_timer_to_memory()
-
+            self.engine.pause(self.current_timer_id)
             self.save_current_timer_state()
-            self.pause_btn.config(text='Resume')
-            self.enable_spinboxes()
             self.save_config()
-            self.update_check.config(state='normal')
         else:
             # --- Resuming the timer ---
+            new_duration_ns = None
             if self.update_timer_var.get():
                 self.normalize_time()
                 new_total = self.get_input_seconds()
                 if new_total <= 0:
                     messagebox.showwarning("Invalid Time", "Please set a duration greater than 0.")
                     return
-                self.end_time = datetime.now() + timedelta(seconds=new_total)
-                self.remaining_duration = timedelta(seconds=new_total)
-                self.save_current_timer_state()
+                new_duration_ns = new_total * NS_PER_SEC
                 self.update_timer_var.set(False)
-            else:
-                pause_duration = datetime.now() - self.pause_time
-                self.end_time += pause_duration
 
             self.save_config()
-            self.update_check.config(state='disabled')
-            self.paused = False
-            self.start_btn.config(text='Stop', state='normal')
-            self.pause_btn.config(text='Pause')
+            self.engine.resume(self.current_timer_id, new_duration_ns)
+            self.save_current_timer_state()
 
-            # --- Sync memory with the new "resumed" state ---
-            self.save_current_timer_to_memory()
+    def on_engine_event(self, event, timer_id):
+        """Keeps the view in step with the engine. Only the displayed timer touches the controls."""
+        if event in ("loaded", "started", "resumed"):
+            self.schedule_alarm_preload()  # The timers due next may have changed
 
-            self.save_current_timer_state()
+        if timer_id != self.current_timer_id:
+            if event == "expired":
+                self.finish_background_timer(timer_id)
+            return
+
+        self.refresh_timer_controls()
+        if event == "expired":
+            self.finish_current_timer()
+        elif event == "stopped":
+            self.update_timer_canvas("00:00:00", color_main="white")
+        self.update_timer()
+
+    def refresh_timer_controls(self):
+        """Sets the buttons, spinboxes and Update Timer box to match the displayed timer's state."""
+        if not self.timer_running:
+            self.start_btn.config(text='Start', state='normal')
+            self.pause_btn.config(text='Pause', state='disabled')
+            self.update_check.config(state='disabled')
+            self.update_timer_var.set(False)
+            self.enable_spinboxes()
+        elif self.paused:
+            self.start_btn.config(text='Stop', state='normal')
+            self.pause_btn.config(text='Resume', state='normal')
+            self.update_check.config(state='normal')
+            self.enable_spinboxes()
+        else:
+            self.start_btn.config(text='Stop', state='normal')
+            self.pause_btn.config(text='Pause', state='normal')
+            self.update_check.config(state='disabled')
+            self.update_timer_var.set(False)
             self.disable_spinboxes()
-            self.update_timer()
 
     def update_timer(self):
+        """
+        Redraws the current timer and re-arms itself for the next moment the display changes.
+        Expiry itself is handled by the scheduler, not here.
+        """
+        if self.display_after_id:
+            self.root.after_cancel(self.display_after_id)
+            self.display_after_id = None
+
         if not self.timer_running:
             return
 
         if self.paused:
             self.handle_pause_flash()
-            self.root.after(500, self.update_timer)
-            return
+            # The flash colour only changes when another whole second of pause has passed
+            elapsed_ns = self.engine.clock() - self.pause_ns if self.pause_ns is not None else 0
+            delay_ns = NS_PER_SEC - elapsed_ns % NS_PER_SEC
+        else:
+            remaining_ns = self.engine.remaining_ns(self.current_timer_id)
+            if remaining_ns <= 0:
+                return
 
-        now = datetime.now()
-        remaining = self.end_time - now
+            self.display_remaining_time(remaining_ns)
+            # The shown value is truncated, so it changes once the fraction runs out
+            delay_ns = remaining_ns % NS_PER_SEC or NS_PER_SEC
 
-        if remaining.total_seconds() <= 0:
-            self.timer_running = False
-            self.start_btn.config(state='normal', text='Start')
-            self.pause_btn.config(state='disabled')
-            self.enable_spinboxes()
-            self.update_check.config(state='disabled')
+        self.display_after_id = self.root.after(-(-delay_ns // NS_PER_MS), self.update_timer)
 
-            self.update_timer_canvas("00:00:00", color_main="#ff3c3c")
+    def finish_current_timer(self):
+        self.update_timer_canvas("00:00:00", color_main="#ff3c3c")
 
-            self.play_alarm(self.sound_path1, self.sound_path2, self.loop_count)
-            self.save_current_timer_state()
-            self.show_timer_finished_popup()
-            return
+        # The sound, the popup and the save come with the batch, see on_alarm_batch
+        self.play_alarm(self.current_timer_id, self.sound_path1, self.sound_path2, self.loop_count)
+
+    def on_alarm_batch(self, timer_ids):
+        """Everything that expired together: one save and one popup, however many timers it was."""
+        self.save_current_timer_state()
+        self.show_timer_finished_popup(timer_ids)
 
-        self.remaining_duration = remaining
-        self.display_remaining_time(remaining)
-        self.root.after(500, self.update_timer)
+    def on_alarm_errors(self, errors):
+        """One dialog for every sound that failed since the last look, e.g. missing files."""
+        messages = "\n".join(dict.fromkeys(str(error) for error in errors))
+        messagebox.showerror("Alarm Error", f"Could not play the alarm sound:\n{messages}")
 
-    def show_timer_finished_popup(self, timer_id=None, title=None):
-        popup = tk.Toplevel(self.root)
+    def show_timer_finished_popup(self, timer_ids):
+        """Lists the finished timers, in the popup that's already open if there is one."""
+        self.finished_timers += [timer_id for timer_id in timer_ids if timer_id in self.timers]
+        if not self.finished_timers:
+            return
+        if self.finished_popup is not None and self.finished_popup.winfo_exists():
+            self.finished_label.config(text=self.finished_text())
+            self.finished_popup.lift()
+            return
+
+        popup = self.finished_popup = tk.Toplevel(self.root)
         popup.title("Timer Finished!")
-        popup.geometry("300x150")
+        popup.minsize(300, 150)
         popup.configure(bg="#1e1e1e")
         popup.resizable(False, False)
         popup.transient(self.root)
         popup.grab_set()
 
-        label_text = "Timer has finished!"
-        if timer_id is not None and title:
-            label_text = f"Timer {timer_id + 1} \"{title}\" has finished!"
-
-        label = tk.Label(popup, text=label_text, font=("Helvetica", 13),
-                         bg="#1e1e1e", fg="white", wraplength=280, justify="center")
-        label.pack(pady=(30, 10))
+        self.finished_label = tk.Label(popup, text=self.finished_text(), font=("Helvetica", 13),
+                                       bg="#1e1e1e", fg="white", wraplength=280, justify="center")
+        self.finished_label.pack(padx=10, pady=(30, 10))
 
         def stop_alarm_and_close():
-            if self.audio_player.playing:
-                self.audio_player.stop()
+            self.stop_alarm()
+            self.finished_timers = []
+            self.finished_popup = None
             popup.destroy()
 
         ok_btn = tk.Button(popup, text="OK", command=stop_alarm_and_close,
@@ -1333,15 +3473,25 @@ class TimerApp:
         # Also handle window close button
         popup.protocol("WM_DELETE_WINDOW", stop_alarm_and_close)
 
-    def show_background_timer_popup(self, timer_id):
-        title = self.timer_switcher.timer_titles[timer_id]
-        self.show_timer_finished_popup(timer_id=timer_id, title=title)
+    def finished_text(self):
+        timer_ids = self.finished_timers
+        if len(timer_ids) == 1:
+            timer_id = timer_ids[0]
+            if timer_id == self.current_timer_id:
+                return "Timer has finished!"
+            return f"Timer {timer_id + 1} \"{self.timers.titles[timer_id]}\" has finished!"
+
+        lines = [f"Timer {timer_id + 1} \"{self.timers.titles[timer_id]}\""
+                 for timer_id in timer_ids[:self.MAX_LISTED_ALARMS]]
+        if len(timer_ids) > self.MAX_LISTED_ALARMS:
+            lines.append(f"...and {len(timer_ids) - self.MAX_LISTED_ALARMS} more")
+        return f"{len(timer_ids)} timers have finished!\n\n" + "\n".join(lines)
 
     def handle_pause_flash(self):
-        if not self.pause_time:
+        if self.pause_ns is None:
             return
 
-        elapsed = int((datetime.now() - self.pause_time).total_seconds())
+        elapsed = (self.engine.clock() - self.pause_ns) // NS_PER_SEC
         # I like to make UI cool
         if elapsed % 4 == 0:
             color = "#f14f8c"  # Red (once every 4 seconds)
@@ -1394,68 +3544,55 @@ class TimerApp:
         self.min_spin.config(state='normal')
         self.sec_spin.config(state='normal')
 
-    def check_all_timers(self):
-        for i in range(8):
-            if i == self.current_timer_id:
-                continue  # Move to the next timer in the loop
-
-            data = self.all_timers_data[i]
-            if data.get("running") and not data.get("paused"):
-                end_time = data.get("end_time")
-                if end_time and isinstance(end_time, datetime):
-                    remaining = end_time - datetime.now()
-                    if remaining.total_seconds() <= 0 and not self.timer_fired_flags[i]:
-                        self.timer_fired_flags[i] = True
-                        data["running"] = False
-                        data["paused"] = False
-                        data["remaining_duration"] = timedelta(seconds=0)
-                        data["end_time"] = None
-
-                        self.play_alarm(
-                            sound1=data.get("sound_path1"),
-                            sound2=data.get("sound_path2"),
-                            loop_count=data.get("loop_count")
-                        )
-
-                        title = self.timer_switcher.timer_titles[i]
-                        self.show_timer_finished_popup(timer_id=i, title=title)
-
-                        # --- Save the updated state ---
-                        self.save_current_timer_state()
-
-        self.root.after(1000, self.check_all_timers)
-
-    def play_alarm(self, sound1, sound2, loop_count):
-        if self.audio_player.playing:
-            self.audio_player.stop()
+    def finish_background_timer(self, timer_id):
+        data = self.timers[timer_id]
+
+        # Popup and save come with the batch, see on_alarm_batch
+        self.play_alarm(
+            timer_id,
+            sound1=data.get("sound_path1"),
+            sound2=data.get("sound_path2"),
+            loop_count=data.get("loop_count")
+        )
+
+    def play_alarm(self, timer_id, sound1, sound2, loop_count):
+        """Hands a finished timer's alarm to the dispatcher, which plays it along with whatever else just expired."""
+        # Missing files aren't checked here, the disk may be slow: the audio worker reports them.
+        # Mixing or queueing is read when the alarm goes off, so the menu setting applies right away
+        self.alarms.mix = self.mix_alarms_var.get()
+        self.alarms.add(timer_id, self.alarm_sound_choices(sound1, sound2), loop_count)
 
+    def alarm_sound_choices(self, sound1, sound2):
+        """The distinct sound files an alarm picks from, with the defaults filling in unset ones."""
         if not sound1: sound1 = self.default_sound1
         if not sound2: sound2 = self.default_sound2
         if sound1 and not sound2: sound2 = sound1
+        return [sound for sound in dict.fromkeys([sound1, sound2]) if sound]
 
-        if not os.path.exists(sound1) or not os.path.exists(sound2):
-            print(f"Alarm sound file(s) missing or invalid.\nPath1: {sound1}\nPath2: {sound2}")
-            messagebox.showerror("Alarm Error", "Could not find the alarm sound file(s).")
-            return
-
-        try:
-            chosen_sound = random.choice([sound1, sound2])
-            self.audio_player.load_file(chosen_sound)
-
-            # Set up the loop counter. 0 means infinite, so we set a high number.
-            # Otherwise, use the user's count (1 means play once, so loops=0).
-            self.alarm_loop_counter = 9999 if loop_count == 0 else loop_count - 1
-
-            self.audio_player.play()
-            print(f"[Alarm] Playing: {os.path.basename(chosen_sound)}")
+    def stop_alarm(self):
+        self.alarms.stop()
 
-        except Exception as e:
-            print("Error playing alarm:", e)
-            messagebox.showerror("Alarm Error", f"Could not play the alarm sound:\n{e}")
+    def schedule_alarm_preload(self):
+        """Preloads once the Tk thread is idle, so a burst of schedule changes (like a restore) is handled once."""
+        if self.preload_after_id is None:
+            self.preload_after_id = self.root.after_idle(self.preload_alarm_sounds)
 
-    def stop_alarm(self):
-        if self.audio_player.playing:
-            self.audio_player.stop()
+    def preload_alarm_sounds(self):
+        """
+        Loads the sounds of the timers due next, soonest first, so their alarms start without touching the disk.
+        Only as many timers as the sound cache holds: preloading more would push the soonest ones out again.
+        """
+        self.preload_after_id = None
+        paths = []
+        for timer_id in self.engine.deadlines.upcoming(self.audio.sounds.max_sounds):
+            if timer_id == self.current_timer_id:
+                sounds = (self.sound_path1, self.sound_path2)  # The controls can be ahead of the stored data
+            else:
+                data = self.timers[timer_id]
+                sounds = (data.get("sound_path1"), data.get("sound_path2"))
+            paths += self.alarm_sound_choices(*sounds)
+        if paths:
+            self.audio.preload(paths)
 
     def change_sound(self):
         filetypes = [("Audio Files", "*.mp3 *.wav *.ogg")]
@@ -1466,47 +3603,38 @@ class TimerApp:
         if not path1 or not os.path.isfile(path1):
             return
 
-        try:
-            # Use a temporary player instance to check duration
-            temp_player = Playback()
-            temp_player.load_file(path1)
-            duration = temp_player.duration
-            temp_player.stop()  # Release the file handle
-
-            if duration > 12:
-                messagebox.showwarning("Too Long", "Primary sound must be 12 seconds or shorter.")
-                return
-            self.sound_path1 = path1
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load primary sound:\n{e}")
+        if not self.check_alarm_sound(path1, "Primary"):
             return
+        self.sound_path1 = path1
 
         # Ask for secondary
         if messagebox.askyesno("Secondary Alarm", "Do you need a secondary alarm to be played randomly?"):
             path2 = filedialog.askopenfilename(title="Select Secondary Alarm Sound", filetypes=filetypes,
                                                initialdir=initial_dir)
-            if path2 and os.path.isfile(path2):
-                try:
-                    temp_player.load_file(path2)
-                    duration = temp_player.duration
-                    temp_player.stop()
-
-                    if duration > 12:
-                        messagebox.showwarning("Too Long", "Secondary sound must be 12 seconds or shorter.")
-                        self.sound_path2 = ""
-                    else:
-                        self.sound_path2 = path2
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to load secondary sound:\n{e}")
-                    self.sound_path2 = ""
+            if path2 and os.path.isfile(path2) and self.check_alarm_sound(path2, "Secondary"):
+                self.sound_path2 = path2
             else:
                 self.sound_path2 = ""
         else:
             self.sound_path2 = ""
 
+        self.schedule_alarm_preload()  # In case this timer is counting down
         self.save_current_timer_state()
         self.show_overlay("Alarm sound(s) set!")
 
+    def check_alarm_sound(self, path, which):
+        """Tells the user and returns False if a picked sound can't be read or is too long for an alarm."""
+        try:
+            info = self.sound_probe.probe(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load {which.lower()} sound:\n{e}")
+            return False
+
+        if info["duration"] > self.MAX_SOUND_SECONDS:
+            messagebox.showwarning("Too Long", f"{which} sound must be {self.MAX_SOUND_SECONDS} seconds or shorter.")
+            return False
+        return True
+
     def choose_sound(self):
         """
         Prompts the user to set alarm sounds with specific logic.
@@ -1531,6 +3659,8 @@ class TimerApp:
         if not primary_path:
             # User cancelled the primary sound selection
             return
+        if not self.check_alarm_sound(primary_path, "Primary"):
+            return
 
         # 2. Ask if the user wants a secondary sound
         use_secondary = messagebox.askyesno(
@@ -1552,6 +3682,8 @@ class TimerApp:
                     "You chose to add a secondary sound but didn't select one. The alarm sounds have not been changed."
                 )
                 return
+            if not self.check_alarm_sound(secondary_path, "Secondary"):
+                return
 
             # Both paths are valid, assign them
             self.sound_path1 = primary_path
@@ -1564,6 +3696,7 @@ class TimerApp:
             self.sound_path2 = primary_path  # Set secondary to be the same as primary
             message = "Custom sound set!"
 
+        self.schedule_alarm_preload()  # In case this timer is counting down
         # Persist the changes for the current timer
         self.save_current_timer_to_memory()
         self.save_current_timer_state()
@@ -1577,10 +3710,8 @@ class TimerApp:
             self.unmark_btn.config(state="disabled")
             return
 
-        note_index = selected_indices[0]
-        note = self.notes[note_index]
-
-        if note.completion_type == "Plain Text":
+        # Mark/Unmark work as long as one of the selected notes has something to mark
+        if all(self.notes[note_index].completion_type == "Plain Text" for note_index in selected_indices):
             self.mark_btn.config(state="disabled")
             self.unmark_btn.config(state="disabled")
         else:
@@ -1589,64 +3720,66 @@ class TimerApp:
 
     def refresh_notes_listbox(self):
         """
-        Clears and re-populates the notes listbox.
-        Long titles are truncated for display. Tooltips will display long titles.
+        Redraws the notes list from self.notes. The list is virtual, so this only re-renders
+        the rows in view (each note caches its row text) and keeps the scroll position.
         """
-        self.notes_listbox.delete(0, tk.END)
-        for note in self.notes:
-            prefix = ""
-            suffix = ""
-            display_title = note.title
-
-            if note.completion_type == "Checkboxes" and note.completion_data is True:
-                prefix = "✓ "
-            elif note.completion_type == "Digits/Full Digits":
-                if note.completion_data and len(note.completion_data) == 3:
-                    current, _, maximum = note.completion_data
-                    suffix = f"  [{current}/{maximum}]"
-
-            # Truncate title for display if it's too long
-            if len(note.title) > 13:
-                display_title = note.title[:13] + "..."
-
-            display_text = f"  {prefix}{display_title}{suffix}"
-            self.notes_listbox.insert(tk.END, display_text)
-
+        self.notes_listbox.refresh()
+        self.tooltip_index = None
         self.on_note_selection_change()
 
     def setup_listbox_tooltip(self):
         """Sets up a dynamic tooltip for the notes listbox."""
         self.tooltip = Tooltip(self.notes_listbox, "")  # Creates a tooltip
-        self.tooltip.hide_tooltip()  # Hide it initially
+        self.tooltip_index = None  # Row the tooltip was last worked out for
+        self.tooltip_y = 0  # Latest mouse position, handled at most once per TOOLTIP_DELAY_MS
+        self.tooltip_after_id = None
         self.notes_listbox.bind("<Motion>", self.update_listbox_tooltip)
+        self.notes_listbox.bind("<Leave>", self.reset_listbox_tooltip, add="+")
 
     def update_listbox_tooltip(self, event):
-        """Shows a tooltip only if the mouse is over a truncated item."""
-        # Find the listbox item under the mouse cursor
-        index = self.notes_listbox.nearest(event.y)
+        """Queues a tooltip update. A burst of motion events is handled once, for where the mouse ended up."""
+        self.tooltip_y = event.y
+        if self.tooltip_after_id is None:
+            self.tooltip_after_id = self.root.after(self.TOOLTIP_DELAY_MS, self.show_listbox_tooltip)
 
-        # Check if the index is valid and corresponds to a note
-        if 0 <= index < len(self.notes):
-            note = self.notes[index]
-            # Show tooltip if the title is long
-            if len(note.title) > 26:
-                prefix = "✓ " if note.completion_type == "Checkboxes" and note.completion_data else ""
-                suffix = ""
-                if note.completion_type == "Digits/Full Digits" and note.completion_data and len(
-                        note.completion_data) == 3:
-                    suffix = f"  [{note.completion_data[0]}/{note.completion_data[2]}]"
-
-                full_text = f"{prefix}{note.title}{suffix}"
-
-                # If the tooltip text is different, update and show it
-                if self.tooltip.text != full_text:
-                    self.tooltip.text = full_text
-                    self.tooltip.show_tooltip(event)
-                return
+    def show_listbox_tooltip(self):
+        """Shows a tooltip only if the mouse is over a truncated item."""
+        self.tooltip_after_id = None
+        # Find the listbox item under the mouse cursor. Moving within the same row changes nothing.
+        index = self.notes_listbox.nearest(self.tooltip_y)
+        if index == self.tooltip_index:
+            return
+        self.tooltip_index = index
 
-        # If we are not over a truncated item, hide the tooltip
-        self.tooltip.hide_tooltip()
-        self.tooltip.text = ""  # Clear the text
+        # Check if the index is valid and corresponds to a note with a long title
+        self.tooltip.text = self.notes[index].tooltip_text() if 0 <= index < len(self.notes) else ""
+        if self.tooltip.text:
+            self.tooltip.show_tooltip()
+        else:
+            # If we are not over a truncated item, hide the tooltip
+            self.tooltip.hide_tooltip()
+
+    def reset_listbox_tooltip(self, event=None):
+        if self.tooltip_after_id is not None:
+            self.root.after_cancel(self.tooltip_after_id)
+            self.tooltip_after_id = None
+        self.tooltip_index = None  # Coming back to the same row shows it again
+
+    def open_note_search(self):
+        """Opens the search over the notes of every timer."""
+        NoteSearch(self)
+
+    def show_note(self, timer_id, note_id):
+        """Switches to a timer and selects one of its notes (used by the note search)."""
+        self.timer_switcher.select_timer(timer_id)
+        index = self.notes.index_of(note_id)
+        if index is None:
+            return
+        self.notes_listbox.selection_clear(0, tk.END)
+        self.notes_listbox.selection_set(index)
+        self.notes_listbox.activate(index)
+        self.notes_listbox.see(index)
+        self.on_note_selection_change()
 
     def open_add_note_dialog(self):
         """Opens the NoteEditor window to create a new note."""
@@ -1664,46 +3797,92 @@ class TimerApp:
         NoteEditor(self, note_to_edit=note_to_edit)  # Pass the actual note object
 
     def delete_selected_note(self):
-        """Deletes the currently selected note from the listbox after confirmation."""
+        """Deletes the selected notes from the listbox after confirmation."""
         selected_indices = self.notes_listbox.curselection()
         if not selected_indices:
             messagebox.showwarning("No Selection", "Please select a note to delete.")
             return
 
-        note_index = selected_indices[0]
-        note_title = self.notes[note_index].title
-
-        if messagebox.askyesno("Confirm Deletion",
-                               f"Are you sure you want to permanently delete the note '{note_title}'?"):
-            self.delete_note_at_index(note_index)
+        if len(selected_indices) == 1:
+            question = f"Are you sure you want to permanently delete the note '{self.notes[selected_indices[0]].title}'?"
+        else:
+            question = f"Are you sure you want to permanently delete these {len(selected_indices)} notes?"
+        if not messagebox.askyesno("Confirm Deletion", question):
+            return
 
-    def update_existing_note(self, updated_note):
-        """Finds an existing note by ID and updates it, also refreshes the UI."""
-        for i, note in enumerate(self.notes):
-            if note.id == updated_note.id:
-                self.notes[i] = updated_note
-                break
+        # From the bottom up, so the positions still to delete don't shift
+        ops = [self._note_deleted(index) for index in reversed(selected_indices)]
+        self.record_note_ops(ops)
+        self.notes_listbox.selection_clear(0, tk.END)
+        self.commit_note_changes()
 
+    def update_existing_note(self, updated_note, before=None):
+        """
+        Finds an existing note by ID and updates it, also refreshes the UI.
+        `before` is the note's state() from before the change, to make it undoable.
+        """
+        self.record_note_ops([self._note_updated(updated_note, before)])
+        self.commit_note_changes()
+
+    def _note_updated(self, updated_note, before=None):
+        """Puts an edited note in place and marks it for saving. Returns its history entry (None if nothing to undo)."""
+        position = self.notes.index_of(updated_note.id)
+        if position is not None:
+            self.notes[position] = updated_note
+
+        updated_note.invalidate()
+        self.timers.note_changed(self.current_timer_id, updated_note)
+
+        after = updated_note.state() if before is not None else None
+        if before is None or before == after:
+            return None
+        return ("edit", self.current_timer_id, updated_note.id, before, after)
+
+    def _note_deleted(self, index):
+        note = self.notes[index]
+        del self.notes[index]
+        self.timers.note_removed(self.current_timer_id, note)
+        return ("delete", self.current_timer_id, index, note)
+
+    def _note_inserted(self, index, note):
+        self.notes.insert(index, note)
+        self.timers.note_changed(self.current_timer_id, note)
+        self.timers.notes_reordered(self.current_timer_id)
+        return ("add", self.current_timer_id, index, note)
+
+    def _note_moved(self, index, direction):
+        """Swaps a note with its neighbour. Returns its new position, or None at either end of the list."""
+        new_index = index - 1 if direction == "up" else index + 1
+        if not (0 <= index < len(self.notes) and 0 <= new_index < len(self.notes)):
+            return None
+        self.notes.swap(index, new_index)
+        self.timers.notes_reordered(self.current_timer_id)
+        return new_index
+
+    def record_note_ops(self, ops):
+        """Adds note operations to the undo history, several of them as a single step."""
+        ops = [op for op in ops if op is not None]
+        if len(ops) == 1:
+            self.history.record(ops[0], UndoHistory.cost(ops[0]))
+        elif ops:
+            batch = ("batch", self.current_timer_id, ops)
+            self.history.record(batch, UndoHistory.cost(batch))
+
+    def commit_note_changes(self):
+        """Redraws the notes list and saves, once per user action however many notes it touched."""
         self.refresh_notes_listbox()
         self.save_current_timer_to_memory()
         self.save_current_timer_state()
 
     def add_new_note_to_current_timer(self, note_object):
         """Adds a new note to the current timer's note list and updates the UI."""
-        self.notes.append(note_object)
-        self.refresh_notes_listbox()
-        # Save the change to memory immediately
-        self.save_current_timer_to_memory()
-        # Also persist to the file
-        self.save_current_timer_state()
+        self.record_note_ops([self._note_inserted(len(self.notes), note_object)])
+        # Save the change to memory immediately, and persist it to the file
+        self.commit_note_changes()
 
     def save_config(self):
-        if not self.present_path:
-            return
-
-        self.config_busy = True
-        self.start_btn.config(state='disabled')
-        self.pause_btn.config(state='disabled')
+        if not self.present_path or is_sqlite_path(self.present_path):
+            return  # SQLite presents are only written as a whole, by save_present
 
         config = configparser.ConfigParser()
         config["TIMER"] = {
@@ -1718,56 +3897,40 @@ class TimerApp:
             "loop": str(self.loop_count if self.loop_count is not None else 1)
         }
 
-        try:
-            with open(self.present_path, "w") as f:
-                config.write(f)
-        except Exception as e:
-            print("Failed to save config:", e)
-
-        self.start_btn.config(state='normal')
-        self.pause_btn.config(state='normal' if self.timer_running else 'disabled')
-        self.config_busy = False
+        buffer = io.StringIO()
+        config.write(buffer)
+        self.persister.write_text(self.present_path, buffer.getvalue())
 
     def load_present_from_file(self, path):
-        """Loads the complete state of all 8 timers from a present file."""
-        config = configparser.ConfigParser()
+        """Loads the complete state of every timer stored in a present file."""
         try:
-            config.read(path)
-
-            # --- Loop Through and Load All 8 Timers ---
-            for i in range(8):
-                section = f"TIMER_{i}"
-                if not config.has_section(section):
-                    continue  # Skip if this timer isn't in the file
-
-                timer_config = config[section]
-
+            # --- Loop Through and Load Every Timer ---
+            for i, timer_config, notes_json in self.read_present(path):
                 # Load basic settings
-                title = timer_config.get("title", f"Timer {i + 1}")
-                self.timer_switcher.timer_titles[i] = title
-
-                # Load notes by deserializing from JSON
-                notes_json = timer_config.get("notes", "[]")
-                notes_data = json.loads(notes_json)
-                notes_list = [Note.from_dict(data) for data in notes_data]
+                self.timers.add(i)
+                self.timers.titles[i] = timer_config.get("title", TimerStore.default_title(i))
 
                 # Update the main data store for this timer
-                self.all_timers_data[i] = {
-                    "days": timer_config.getint("days", 0),
-                    "hours": timer_config.getint("hours", 0),
-                    "minutes": timer_config.getint("minutes", 0),
-                    "seconds": timer_config.getint("seconds", 0),
+                self.engine.load(i, {
+                    "days": int(timer_config.get("days", 0)),
+                    "hours": int(timer_config.get("hours", 0)),
+                    "minutes": int(timer_config.get("minutes", 0)),
+                    "seconds": int(timer_config.get("seconds", 0)),
                     "sound_path1": timer_config.get("sound_path1", ""),
                     "sound_path2": timer_config.get("sound_path2", ""),
-                    "loop_count": timer_config.getint("loop_count", 1),
-                    "notes": notes_list,
+                    "loop_count": int(timer_config.get("loop_count", 1)),
                     # Reset live state variables (might need to remove this)
                     "paused": False,
                     "running": False,
-                    "remaining_duration": 0,
-                    "pause_time": None,
-                    "end_time": None,
-                }
+                    "remaining_ns": 0,
+                    "pause_ns": None,
+                    "end_ns": None,
+                })
+                # Notes are only parsed once the timer is switched to
+                self.timers.set_raw_notes(i, notes_json)
+
+            # The loaded notes replace what the history refers to
+            self.history.clear()
 
             # After loading all data, refresh the UI to show the current timer's state
             self.load_timer_from_memory()
@@ -1777,6 +3940,35 @@ class TimerApp:
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load present file:\n{e}")
 
+    def read_present(self, path):
+        """Returns [(timer_id, fields, notes_json)] from an INI or SQLite present file."""
+        if is_sqlite_path(path):
+            store = SqliteState(path)
+            try:
+                store.present = self.sqlite_present_name(path, store.present_names())
+                return store.load()
+            finally:
+                store.close()
+
+        config = configparser.ConfigParser()
+        config.read(path)
+        rows = []
+        for section in config.sections():
+            i = self.section_timer_id(section, "TIMER_")
+            if i is None:
+                continue  # Not a timer section
+            fields = dict(config[section])
+            rows.append((i, fields, fields.pop("notes", "[]")))
+        return rows
+
+    @staticmethod
+    def sqlite_present_name(path, existing=()):
+        """A SQLite present file can hold several presents: use the one named after the file, else the first."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        if existing and name not in existing:
+            return existing[0]
+        return name
+
     def new_present(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("New Present")
@@ -1799,10 +3991,13 @@ class TimerApp:
                 messagebox.showwarning("Name Required", "Please enter a present name.")
                 return
             path = filedialog.asksaveasfilename(defaultextension=".ini", initialfile=name,
-                                                filetypes=[("INI Files", "*.ini")])
+                                                filetypes=PRESENT_FILETYPES)
             if path:
                 self.present_path = path
-                self.save_config()
+                if is_sqlite_path(path):
+                    self.save_present()
+                else:
+                    self.save_config()
             dialog.destroy()
 
         btn = tk.Button(dialog, text="Create", command=create, bg="#211c90", fg="white", font=("Helvetica", 12))
@@ -1810,20 +4005,20 @@ class TimerApp:
 
     def import_present(self):
         path = filedialog.askopenfilename(
-            filetypes=[("INI files", "*.ini")],
+            filetypes=PRESENT_FILETYPES,
             title="Import Present"
         )
         if path:
             self.load_present_from_file(path)
 
     def save_present(self):
-        """Saves the complete state of all 8 timers to a present file."""
+        """Saves the complete state of every timer to a present file."""
         path = self.present_path
         if not path:
             path = filedialog.asksaveasfilename(
                 title="Save Present As...",
                 defaultextension=".ini",
-                filetypes=[("Present Files", "*.ini")]
+                filetypes=PRESENT_FILETYPES
             )
             if not path:
                 return  # User cancelled
@@ -1831,45 +4026,61 @@ class TimerApp:
         # Before saving, make sure the currently displayed data is synced to memory
         self.save_current_timer_to_memory()
 
-        config = configparser.ConfigParser()
-
-        # --- Save Global Settings (to be continued) ---
-        # config["GLOBAL"] = {"version": "1.0"}
-
-        # --- Loop Through and Save All 8 Timers ---
-        for i in range(8):
-            section = f"TIMER_{i}"
-            config[section] = {}
-            timer_data = self.all_timers_data[i]
+        # --- Loop Through and Save Every Timer ---
+        rows = []
+        for i in self.timers:
+            timer_data = self.timers[i]
 
             # Save basic settings
-            config[section]["title"] = self.timer_switcher.timer_titles[i]
-            config[section]["days"] = str(timer_data.get("days", 0))
-            config[section]["hours"] = str(timer_data.get("hours", 0))
-            config[section]["minutes"] = str(timer_data.get("minutes", 0))
-            config[section]["seconds"] = str(timer_data.get("seconds", 0))
-            config[section]["sound_path1"] = timer_data.get("sound_path1", "") or ""
-            config[section]["sound_path2"] = timer_data.get("sound_path2", "") or ""
-            config[section]["loop_count"] = str(timer_data.get("loop_count", 1))
+            fields = {
+                "title": self.timers.titles[i],
+                "days": str(timer_data.get("days", 0)),
+                "hours": str(timer_data.get("hours", 0)),
+                "minutes": str(timer_data.get("minutes", 0)),
+                "seconds": str(timer_data.get("seconds", 0)),
+                "sound_path1": timer_data.get("sound_path1", "") or "",
+                "sound_path2": timer_data.get("sound_path2", "") or "",
+                "loop_count": str(timer_data.get("loop_count", 1)),
+            }
 
             # Save notes by serializing to JSON
-            notes_list = timer_data.get("notes", [])
-            notes_as_dicts = [note.to_dict() for note in notes_list]
-            config[section]["notes"] = json.dumps(notes_as_dicts)
+            rows.append((i, fields, self.timers.notes_json(i)))
 
         try:
-            with open(path, "w") as f:
-                config.write(f)
+            self.write_present(path, rows)
             self.present_path = path
             self.show_overlay("Present saved!")
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save present file:\n{e}")
 
+    def write_present(self, path, rows):
+        """Writes [(timer_id, fields, notes_json)] as a whole present file, INI or SQLite."""
+        if is_sqlite_path(path):
+            store = SqliteState(path)
+            try:
+                store.present = self.sqlite_present_name(path, store.present_names())
+                store.replace(rows)
+            finally:
+                store.close()
+            return
+
+        config = configparser.ConfigParser()
+
+        # --- Save Global Settings (to be continued) ---
+        # config["GLOBAL"] = {"version": "1.0"}
+
+        for i, fields, notes_json in rows:
+            config[f"TIMER_{i}"] = dict(fields, notes=notes_json)
+
+        buffer = io.StringIO()
+        config.write(buffer)
+        atomic_write_text(path, buffer.getvalue())
+
     def delete_present(self):
         path = self.present_path
         if not path:
             path = filedialog.askopenfilename(
-                filetypes=[("INI files", "*.ini")],
+                filetypes=PRESENT_FILETYPES,
                 title="Delete Present"
             )
             if not path:
@@ -1883,6 +4094,9 @@ class TimerApp:
         if confirm:
             try:
                 os.remove(path)
+                for leftover in (path + "-wal", path + "-shm"):  # SQLite side files
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
                 if path == self.present_path:
                     self.present_path = None
             except Exception as e:
@@ -1901,34 +4115,116 @@ class TimerApp:
     def delete_note_at_index(self, index):
         """Deletes a note from the list by its index."""
         if 0 <= index < len(self.notes):
-            del self.notes[index]
-            self.refresh_notes_listbox()
-            self.save_current_timer_to_memory()
-            self.save_current_timer_state()
+            self.record_note_ops([self._note_deleted(index)])
+            self.notes_listbox.selection_clear(0, tk.END)
+            self.commit_note_changes()
 
     def move_note(self, index, direction):
         """Moves a note up or down in the list."""
-        if direction == "up" and index > 0:
-            # Swap with the element above
-            self.notes[index], self.notes[index - 1] = self.notes[index - 1], self.notes[index]
-            new_index = index - 1
-        elif direction == "down" and index < len(self.notes) - 1:
-            # Swap with the element below
-            self.notes[index], self.notes[index + 1] = self.notes[index + 1], self.notes[index]
-            new_index = index + 1
-        else:
+        new_index = self._note_moved(index, direction)
+        if new_index is None:
             return False  # Move was not possible
 
-        self.refresh_notes_listbox()
+        self.record_note_ops([("move", self.current_timer_id, index, direction)])
+        self.commit_note_changes()
+
         # Reselect the moved item for a better user experience
+        self.select_notes([new_index])
+        return True  # Move was successful
+
+    def move_selected_notes(self, direction):
+        """Moves every selected note one step up or down, as a block that stops at the end of the list."""
+        selected_indices = self.notes_listbox.curselection()
+        if not selected_indices:
+            return "break"
+
+        ops = []
+        new_indices = []
+        if direction == "up":
+            order, bound, step = selected_indices, 0, 1
+        else:
+            order, bound, step = reversed(selected_indices), len(self.notes) - 1, -1
+        for index in order:
+            # A note stuck against the end (or against a stuck note) stays where it is
+            new_index = self._note_moved(index, direction) if index != bound else None
+            if new_index is None:
+                new_index = index
+            else:
+                ops.append(("move", self.current_timer_id, index, direction))
+            new_indices.append(new_index)
+            bound = new_index + step
+
+        if ops:
+            self.record_note_ops(ops)
+            self.commit_note_changes()
+            self.select_notes(new_indices)
+        return "break"
+
+    def select_notes(self, indices):
         self.notes_listbox.selection_clear(0, tk.END)
-        self.notes_listbox.selection_set(new_index)
-        self.notes_listbox.activate(new_index)
+        for index in indices:
+            self.notes_listbox.selection_set(index)
+        if indices:
+            self.notes_listbox.activate(indices[0])
+            self.notes_listbox.see(indices[0])
+        self.on_note_selection_change()
 
-        # Save changes
-        self.save_current_timer_to_memory()
-        self.save_current_timer_state()
-        return True  # Move was successful
+    def undo(self, event=None):
+        if self._typing_in(event):
+            return None
+        self.replay(self.history.undo(), undo=True)
+        return "break"
+
+    def redo(self, event=None):
+        if self._typing_in(event):
+            return None
+        self.replay(self.history.redo(), undo=False)
+        return "break"
+
+    @staticmethod
+    def _typing_in(event):
+        """Ctrl+Z in the title or a duration field belongs to that field, not to the notes."""
+        return event is not None and isinstance(event.widget, (tk.Entry, tk.Spinbox))
+
+    def replay(self, op, undo):
+        """Reverts (undo=True) or re-applies an operation from the history, on the timer it happened on."""
+        if op is None or op[1] not in self.timers:
+            return
+        self.timer_switcher.select_timer(op[1])  # Show the change where it happens
+
+        # A batch is undone back to front
+        ops = op[2] if op[0] == "batch" else [op]
+        touched = [self._replay_op(sub_op, undo) for sub_op in (reversed(ops) if undo else ops)]
+        self.commit_note_changes()
+        self.select_notes(sorted({index for index in touched if index is not None}))
+
+    def _replay_op(self, op, undo):
+        """Applies one history entry to the data. Returns the position to select afterwards, if any."""
+        kind = op[0]
+        if kind == "edit":
+            _, _, note_id, before, after = op
+            note = self.notes.get(note_id)
+            if note is None:
+                return None
+            note.restore(before if undo else after)
+            self._note_updated(note)
+            return self.notes.index_of(note_id)
+
+        if kind in ("add", "delete"):
+            _, _, index, note = op
+            if (kind == "add") == undo:
+                if 0 <= index < len(self.notes):
+                    self._note_deleted(index)
+                return None
+            self._note_inserted(min(index, len(self.notes)), note)
+            return index
+
+        # move
+        _, _, index, direction = op
+        if undo:
+            index += -1 if direction == "up" else 1
+            direction = "down" if direction == "up" else "up"
+        return self._note_moved(index, direction)
 
     def set_loop(self):
         loop_win = tk.Toplevel(self.root)
@@ -1986,49 +4282,39 @@ class TimerApp:
 
     def try_restore_timer(self):
         # Initialize flags before loop, so we can set them correctly for expired timers.
-        self.timer_fired_flags = [False for _ in range(8)]
-
-        if not os.path.exists(self.timer_file):
-            return
+        self.timers.fired.clear()
 
-        config = configparser.ConfigParser()
         try:
-            config.read(self.timer_file)
-
-            for timer_id in range(8):
-                section_name = f"TIMER {timer_id}"
-                if section_name not in config:
-                    continue
+            # The checkpoint with the journal replayed on top of it
+            restored = self.state_file.load()
+            expired_on_restore = set()
+            outdated = set()
 
-                timer = config[section_name]
+            for timer_id, timer, notes_json in restored:
+                if int(timer.get("version", "1")) < STATE_FORMAT_VERSION:
+                    outdated.add(timer_id)
 
                 # Extract state
                 running = timer.get("running", "no").lower() == "yes"
                 paused = timer.get("paused", "no").lower() == "yes"
-                end_time_str = timer.get("end_time", "")
-                pause_time_str = timer.get("pause_time", "")
-                remaining_seconds = int(timer.get("remaining_seconds", "0"))
-
-                # Convert time strings to datetime objects
-                end_time = datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S") if end_time_str else None
-                pause_time = datetime.strptime(pause_time_str, "%Y-%m-%d %H:%M:%S") if pause_time_str else None
+                end_wall, pause_wall, remaining_ns = self.parse_saved_times(timer)
 
                 # Check if a running timer expired while the app was closed.
-                if running and end_time and end_time <= datetime.now():
+                if running and end_wall is not None and end_wall <= time.time_ns():
                     running = False
                     paused = False
-                    end_time = None
-                    pause_time = None
-                    remaining_seconds = 0
-                    self.timer_fired_flags[timer_id] = True  # Mark as fired to prevent popup on launch.
-
-                # Deserialize notes from JSON
-                notes_json = timer.get("notes", "[]")
-                notes_data = json.loads(notes_json)
-                notes_list = [Note.from_dict(data) for data in notes_data]
-
-                # Store the fully parsed state into our in-memory list.
-                self.all_timers_data[timer_id] = {
+                    end_wall = None
+                    pause_wall = None
+                    remaining_ns = 0
+                    self.timers.fired.add(timer_id)  # Mark as fired to prevent popup on launch.
+                    expired_on_restore.add(timer_id)
+
+                # From here on the deadlines live on the monotonic clock
+                end_ns = monotonic_ns_from_wall(end_wall) if end_wall is not None else None
+                pause_ns = monotonic_ns_from_wall(pause_wall) if pause_wall is not None else None
+
+                # Hand the fully parsed state to the engine, which schedules it if it's counting down.
+                self.engine.load(timer_id, {
                     "days": int(timer.get("days", "0")),
                     "hours": int(timer.get("hours", "0")),
                     "minutes": int(timer.get("minutes", "0")),
@@ -2038,13 +4324,20 @@ class TimerApp:
                     "loop_count": int(timer.get("loop", "1")),
                     "paused": paused,
                     "running": running,
-                    "end_time": end_time,
-                    "pause_time": pause_time,
-                    "remaining_duration": remaining_seconds,  # Stored as seconds
-                    "notes": notes_list,
-                }
+                    "end_ns": end_ns,
+                    "pause_ns": pause_ns,
+                    "remaining_ns": remaining_ns,
+                })
+                # Notes stay unparsed until the timer is shown
+                self.timers.set_raw_notes(timer_id, notes_json)
+
+                self.timers.titles[timer_id] = timer.get("title", TimerStore.default_title(timer_id))
 
-                self.timer_switcher.timer_titles[timer_id] = timer.get("title", f"Timer {timer_id + 1}")
+            # What was just read is already on disk. Only write back what restoring changed,
+            # plus timers still in the old format so they get upgraded.
+            self.timers.forget_changes()
+            for timer_id in expired_on_restore | outdated:
+                self.timers.mark_dirty(timer_id)
 
             # After restoring all timers into memory, reset UI.
             self.load_timer_from_memory()
@@ -2052,14 +4345,11 @@ class TimerApp:
         except Exception as e:
             print(f"Failed to restore timers from '{self.timer_file}': {e}")
 
-    def display_remaining_time(self, remaining=None):
-        if remaining is None:
-            if self.paused:
-                remaining = self.remaining_duration
-            else:
-                remaining = self.end_time - datetime.now()
+    def display_remaining_time(self, remaining_ns=None):
+        if remaining_ns is None:
+            remaining_ns = self.engine.remaining_ns(self.current_timer_id)
 
-        total_seconds = int(remaining.total_seconds())
+        total_seconds = remaining_ns // NS_PER_SEC
         weeks, seconds = divmod(total_seconds, 7 * 86400)
         days, seconds = divmod(seconds, 86400)
         hours, seconds = divmod(seconds, 3600)
@@ -2081,74 +4371,101 @@ class TimerApp:
         # First, ensure the data for the currently active UI is synced to our in-memory.
         self.save_current_timer_to_memory()
 
-        # Block UI to prevent changes during the save operation. Yes I hear you Son Of a Glitch.
-        self.config_busy = True
-        self.start_btn.config(state='disabled')
-        self.pause_btn.config(state='disabled')
+        # Only what changed since the last save is collected: settings of dirty timers,
+        # the notes that were edited, and the note order of lists that were reshuffled.
+        notes, order = self.timers.take_note_changes()
+        timers = {i: self.build_state_section(i) for i in self.timers.take_dirty()}
+        if not (timers or notes or order):
+            return
 
-        config = configparser.ConfigParser()
+        # The changes are appended to the journal in the background.
+        # A burst of saves (marking notes, pause/resume...) turns into a single append.
+        self.state_file.queue(timers, notes, order)
+        self.persister.submit(self.timer_file, self.state_file.commit)
 
-        # Iterate through all 8 timers' data stored in memory and build the config.
-        for i in range(8):
-            timer_data = self.all_timers_data[i]
-            section_name = f"TIMER {i}"
-            config[section_name] = {}
-
-            # Save the base duration settings
-            config[section_name]["days"] = str(timer_data.get("days", 0))
-            config[section_name]["hours"] = str(timer_data.get("hours", 0))
-            config[section_name]["minutes"] = str(timer_data.get("minutes", 0))
-            config[section_name]["seconds"] = str(timer_data.get("seconds", 0))
-
-            # Save metadata and sounds
-            config[section_name]["title"] = self.timer_switcher.timer_titles[i]
-            config[section_name]["sound1"] = timer_data.get("sound_path1", "") or ""
-            config[section_name]["sound2"] = timer_data.get("sound_path2", "") or ""
-            config[section_name]["loop"] = str(timer_data.get("loop_count", 1))
-
-            # Serialize the notes list into a JSON string
-            notes_list = timer_data.get("notes", [])
-            notes_as_dicts = [note.to_dict() for note in notes_list]
-            config[section_name]["notes"] = json.dumps(notes_as_dicts)
-
-            # Save the dynamic running/paused state
-            is_running = timer_data.get("running", False)
-            is_paused = timer_data.get("paused", False)
-            config[section_name]["running"] = "yes" if is_running else "no"
-            config[section_name]["paused"] = "yes" if is_paused else "no"
-
-            if is_running:
-                end_time = timer_data.get("end_time")
-                pause_time = timer_data.get("pause_time")
-
-                if end_time:
-                    config[section_name]["end_time"] = end_time.strftime("%Y-%m-%d %H:%M:%S")
-
-                if is_paused and pause_time:
-                    config[section_name]["pause_time"] = pause_time.strftime("%Y-%m-%d %H:%M:%S")
-
-                # Accurately determine the remaining seconds to save
-                remaining_secs = 0
-                if is_paused:
-                    # When paused, the saved duration (in seconds) is authoritative.
-                    remaining_secs = timer_data.get("remaining_duration", 0)
-                elif end_time:
-                    # When actively running, calculate remaining time from now.
-                    remaining_secs = max(0, (end_time - datetime.now()).total_seconds())
-
-                config[section_name]["remaining_seconds"] = str(int(remaining_secs))
+    def build_state_section(self, i):
+        """Builds the CurrentTimer.ini key/value pairs for one timer, apart from its notes."""
+        timer_data = self.timers[i]
+        section = {}
 
-        try:
-            # Write the complete configuration for all 8 timers to the file.
-            with open(self.timer_file, "w") as f:
-                config.write(f)
-        except Exception as e:
-            print(f"Failed to save state for all timers to '{self.timer_file}': {e}")
-        finally:
-            # Restore UI button states based on the currently displayed timer.
-            self.start_btn.config(state='normal')
-            self.pause_btn.config(state='normal' if self.timer_running else 'disabled')
-            self.config_busy = False
+        section["version"] = str(STATE_FORMAT_VERSION)
+
+        # Save the base duration settings
+        section["days"] = str(timer_data.get("days", 0))
+        section["hours"] = str(timer_data.get("hours", 0))
+        section["minutes"] = str(timer_data.get("minutes", 0))
+        section["seconds"] = str(timer_data.get("seconds", 0))
+
+        # Save metadata and sounds
+        section["title"] = self.timers.titles[i]
+        section["sound1"] = timer_data.get("sound_path1", "") or ""
+        section["sound2"] = timer_data.get("sound_path2", "") or ""
+        section["loop"] = str(timer_data.get("loop_count", 1))
+
+        # Save the dynamic running/paused state
+        is_running = timer_data.get("running", False)
+        is_paused = timer_data.get("paused", False)
+        section["running"] = "yes" if is_running else "no"
+        section["paused"] = "yes" if is_paused else "no"
+
+        if is_running:
+            end_ns = timer_data.get("end_ns")
+            pause_ns = timer_data.get("pause_ns")
+
+            # Deadlines are stored as wall-clock epoch nanoseconds, exact and cheap to parse
+            if end_ns is not None:
+                section["end_ns"] = str(wall_ns_from_monotonic(end_ns))
+
+            if is_paused and pause_ns is not None:
+                section["pause_ns"] = str(wall_ns_from_monotonic(pause_ns))
+
+            # Accurately determine the remaining seconds to save
+            remaining_ns = 0
+            if is_paused:
+                # When paused, the saved duration is authoritative.
+                remaining_ns = timer_data.get("remaining_ns", 0)
+            elif end_ns is not None:
+                # When actively running, calculate remaining time from now.
+                remaining_ns = max(0, end_ns - time.monotonic_ns())
+
+            section["remaining_ns"] = str(remaining_ns)
+
+        return section
+
+    @classmethod
+    def parse_saved_times(cls, timer):
+        """Returns (end wall ns or None, pause wall ns or None, remaining ns) from saved timer fields of any version."""
+        if int(timer.get("version", "1")) >= 2:
+            end_ns = timer.get("end_ns", "")
+            pause_ns = timer.get("pause_ns", "")
+            return (int(end_ns) if end_ns else None,
+                    int(pause_ns) if pause_ns else None,
+                    int(timer.get("remaining_ns", "0")))
+
+        # Version 1: local time strings, whole seconds only
+        return (cls.parse_wall_time(timer.get("end_time", "")),
+                cls.parse_wall_time(timer.get("pause_time", "")),
+                int(timer.get("remaining_seconds", "0")) * NS_PER_SEC)
+
+    @staticmethod
+    def parse_wall_time(text):
+        """Parses a version 1 '%Y-%m-%d %H:%M:%S' string into wall-clock nanoseconds (None if empty)."""
+        if not text:
+            return None
+        return int(datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()) * NS_PER_SEC
+
+    @staticmethod
+    def section_timer_id(section_name, prefix):
+        """Returns the timer id from a section name like 'TIMER 12', or None for other sections."""
+        if section_name.startswith(prefix) and section_name[len(prefix):].isdigit():
+            return int(section_name[len(prefix):])
+        return None
+
+    def add_timer(self):
+        """Creates a new empty timer after the existing ones and switches to it."""
+        timer_id = self.timers.add()
+        self.timer_switcher.select_timer(timer_id)
+        self.save_current_timer_state()
 
     def switch_timer(self, timer_id):
         self.save_current_timer_to_memory()  # Save current one first
@@ -2156,88 +4473,57 @@ class TimerApp:
         self.load_timer_from_memory()  # Load new one
 
     def save_current_timer_to_memory(self):
-        self.all_timers_data[self.current_timer_id] = {
+        """
+        Copies the displayed timer's settings into the store. Its running state belongs to the engine.
+        The timer is only marked dirty when a setting actually changed; note edits mark it themselves,
+        since self.notes is the very list held in the store.
+        """
+        data = self.timers[self.current_timer_id]
+        settings = {
             "days": self.day_var.get(),
             "hours": self.hour_var.get(),
             "minutes": self.min_var.get(),
             "seconds": self.sec_var.get(),
-            "paused": self.paused,
-            "running": self.timer_running,
-            "remaining_duration": self.remaining_duration.total_seconds() if self.remaining_duration else 0,
-            "pause_time": self.pause_time,
-            "end_time": self.end_time,
             "sound_path1": self.sound_path1,
             "sound_path2": self.sound_path2,
             "loop_count": self.loop_count,
-            "notes": self.notes,
         }
+        if data.get("notes") is not self.notes:
+            data["notes"] = self.notes
+            self.timers.notes_replaced(self.current_timer_id)
+        if any(data.get(key) != value for key, value in settings.items()):
+            data.update(settings)
+            self.timers.mark_dirty(self.current_timer_id)
 
     def load_timer_from_memory(self):
-        data = self.all_timers_data[self.current_timer_id]
+        data = self.timers[self.current_timer_id]
 
         self.day_var.set(data.get("days", 0))
         self.hour_var.set(data.get("hours", 0))
         self.min_var.set(data.get("minutes", 0))
         self.sec_var.set(data.get("seconds", 0))
 
-        self.paused = data.get("paused", False)
-        self.timer_running = data.get("running", False)
-        remaining_secs = data.get("remaining_duration", 0)
-        self.remaining_duration = timedelta(seconds=remaining_secs) if remaining_secs else None
-
-        self.pause_time = data.get("pause_time", None)
-        self.end_time = data.get("end_time", None)
-
         self.sound_path1 = data.get("sound_path1", "")
         self.sound_path2 = data.get("sound_path2", "")
         self.loop_count = data.get("loop_count", 1)
 
-        self.notes = data.get("notes", [])
+        self.notes = self.timers.notes(self.current_timer_id)
+        self.notes_listbox.reset()
         self.refresh_notes_listbox()
 
         # Re-sync title entry
-        self.timer_switcher.title_var.set(self.timer_switcher.timer_titles[self.current_timer_id])
-
-        self.update_timer_canvas("00:00:00", color_main="white")
-        self.start_btn.config(text="Start", state="normal")
-        self.pause_btn.config(state='disabled')
-        self.update_check.config(state='disabled')
-        self.update_timer_var.set(False)
-        self.enable_spinboxes()
+        self.timer_switcher.title_var.set(self.timers.titles[self.current_timer_id])
 
+        self.refresh_timer_controls()
         if self.timer_running:
-            if self.paused:
-                self.start_btn.config(text='Stop', state='normal')
-                self.pause_btn.config(text='Resume', state='normal')
-                self.update_check.config(state='normal')
-                self.display_remaining_time()
-                self.handle_pause_flash()
-            else:
-                self.start_btn.config(text='Stop', state='normal')
-                self.pause_btn.config(text='Pause', state='normal')
-                self.disable_spinboxes()
-                self.update_check.config(state='disabled')
-                self.update_timer_var.set(False)
-                self.display_remaining_time()
-                self.update_timer()
+            self.display_remaining_time()
+        else:
+            self.update_timer_canvas("00:00:00", color_main="white")
 
-        self.timer_fired_flags[self.current_timer_id] = False
+        # Re-arm (or drop) the display tick for whichever timer is now shown
+        self.update_timer()
 
-    def store_timer_to_memory(self):
-        self.all_timers_data[self.current_timer_id] = {
-            "days": self.day_var.get(),
-            "hours": self.hour_var.get(),
-            "minutes": self.min_var.get(),
-            "seconds": self.sec_var.get(),
-            "paused": self.paused,
-            "running": self.timer_running,
-            "remaining_duration": int(self.remaining_duration.total_seconds()) if self.remaining_duration else 0,
-            "pause_time": self.pause_time,
-            "end_time": self.end_time,
-            "sound_path1": self.sound_path1,
-            "sound_path2": self.sound_path2,
-            "loop_count": self.loop_count,
-        }
+        self.timers.fired.discard(self.current_timer_id)
 
 
 if __name__ == "__main__":
@@ -2246,6 +4532,12 @@ if __name__ == "__main__":
 
     def on_closing():
         app.save_current_timer_state()
+        app.persister.close()  # Make sure everything queued is on disk before we go
+        app.audio.close()
+        try:
+            app.state_file.checkpoint()  # Start the next session from a clean checkpoint
+        except Exception as e:
+            print(f"Failed to checkpoint '{app.timer_file}': {e}")
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)